@@ -0,0 +1,51 @@
+"""
+Leaf evaluation throughput of RobustMinimaxAgent, in positions/sec:
+heuristic() from the incremental counters, heuristic() with a full flood
+fill (incremental=False) and evaluate_batch() at several batch sizes.
+
+Usage (from Task02/):  python -m bench.evaluate [--positions N]
+"""
+import argparse
+import time
+
+from game import GoProblem, RobustMinimaxAgent
+from bench.territory import random_positions
+
+
+def positions_per_sec(fn, states, min_time=0.5):
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn(states)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls * len(states) / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    incremental = RobustMinimaxAgent(GoProblem())
+    scan = RobustMinimaxAgent(GoProblem(), incremental=False)
+    for size in (9, 19):
+        states = random_positions(size, args.positions)
+        expected = [incremental.heuristic(s) for s in states]
+        assert list(incremental.evaluate_batch(states)) == expected
+        assert [scan.heuristic(s) for s in states] == expected
+
+        print(f"{size}x{size}, {len(states)} positions")
+        rate = positions_per_sec(lambda ss: [incremental.heuristic(s) for s in ss], states)
+        print(f"  heuristic (incremental)    {rate:10.0f} positions/s")
+        rate = positions_per_sec(lambda ss: [scan.heuristic(s) for s in ss], states)
+        print(f"  heuristic (flood fill)     {rate:10.0f} positions/s")
+        for batch in (1, 16, len(states)):
+            chunks = [states[i:i + batch] for i in range(0, len(states), batch)]
+            rate = positions_per_sec(lambda cs: [incremental.evaluate_batch(c) for c in cs], chunks)
+            print(f"  evaluate_batch (N={batch:<4})    {rate * batch:10.0f} positions/s")
+
+
+if __name__ == '__main__':
+    main()
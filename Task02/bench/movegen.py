@@ -0,0 +1,60 @@
+"""
+Legal-move generation benchmark: GoProblem.actions against the reference
+deepcopy-based generator on seeded random positions.
+
+Usage (from Task02/):  python -m bench.movegen [--positions N] [--repeat R]
+"""
+import argparse
+import time
+
+from game import GoProblem
+from bench.positions import random_positions
+from bench.reference import ReferenceState, ReferenceProblem
+
+
+def position_pairs(count, min_moves=20, max_moves=60, seed=0, size=9):
+    """Returns (GoState, ReferenceState) pairs reached by the same random moves."""
+    ref_problem = ReferenceProblem()
+    pairs = []
+    for moves, state in random_positions(count, min_moves, max_moves, seed, size):
+        ref = ReferenceState(size)
+        for move in moves:
+            ref = ref_problem.result(ref, move)
+        pairs.append((state, ref))
+    return pairs
+
+
+def time_per_call(fn, states, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for s in states:
+            fn(s)
+    return (time.perf_counter() - start) / (repeat * len(states))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    problem, ref_problem = GoProblem(), ReferenceProblem()
+    pairs = position_pairs(args.positions)
+    for state, ref in pairs:
+        assert problem.actions(state) == ref_problem.actions(ref), "move lists differ"
+
+    states = [s for s, _ in pairs]
+    refs = [r for _, r in pairs]
+    fast = time_per_call(problem.actions, states, args.repeat)
+    first = time_per_call(lambda s: next(problem.iter_actions(s), None), states, args.repeat)
+    slow = time_per_call(ref_problem.actions, refs, max(1, args.repeat // 5))
+    avg_moves = sum(len(problem.actions(s)) for s in states) / len(states)
+
+    print(f"positions: {len(states)}, avg legal moves: {avg_moves:.1f}")
+    print(f"reference actions():  {slow * 1e6:10.1f} us")
+    print(f"GoProblem.actions():  {fast * 1e6:10.1f} us  ({slow / fast:.0f}x faster)")
+    print(f"first legal move:     {first * 1e6:10.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Move-ordering benchmark: nodes visited and time of a fixed-depth
+RobustMinimaxAgent search on a fixed set of positions, with raster order,
+transposition-table move only, and the full MoveOrderer.
+
+Usage (from Task02/):  python -m bench.ordering [--positions N] [--depth D]
+"""
+import argparse
+import time
+
+from game import GoProblem, RobustMinimaxAgent, MoveOrderer
+from bench.positions import random_positions
+
+
+CONFIGS = [
+    ('raster', dict(tt_size=None, ordering=None)),
+    ('tt move', dict(ordering=None)),
+    ('tt + MoveOrderer', dict(ordering='orderer')),
+]
+
+
+def run(states, depth, options):
+    problem = GoProblem()
+    nodes = 0
+    start = time.perf_counter()
+    for state in states:
+        options = dict(options)
+        if options.get('ordering') == 'orderer':
+            options['ordering'] = MoveOrderer()
+        agent = RobustMinimaxAgent(problem, depth=depth, ai_color=state.current_player, **options)
+        agent.get_best_move(state)
+        nodes += agent.nodes
+    return nodes, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=12)
+    parser.add_argument('--depth', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    states = [state for _, state in random_positions(args.positions, 10, 70, seed=1)]
+    print(f"{len(states)} positions, depth {args.depth}")
+    base_nodes = None
+    for name, options in CONFIGS:
+        nodes, elapsed = run(states, args.depth, options)
+        if base_nodes is None:
+            base_nodes = nodes
+        print(f"{name:18s} {nodes:10d} nodes  {nodes / base_nodes:6.1%} of raster  {elapsed:7.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Root-parallel search benchmark: time of fixed-depth RobustMinimaxAgent
+searches with 1/2/4/8 worker processes on a fixed position set.
+
+Usage (from Task02/):  python -m bench.parallel [--positions N] [--depth D] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import time
+
+from game import GoProblem, RobustMinimaxAgent, MoveOrderer
+from bench.ordering import fixed_positions
+
+
+def run(states, depth, workers):
+    problem = GoProblem()
+    agents = {color: RobustMinimaxAgent(problem, depth=depth, ai_color=color, ordering=MoveOrderer(),
+                                        tt_size=None, workers=workers)
+              for color in {s.current_player for s in states}}
+    try:
+        if workers > 1:
+            # Start the pools outside the timed region
+            for agent in agents.values():
+                agent.get_best_move(states[0])
+        moves = []
+        nodes = 0
+        start = time.perf_counter()
+        for state in states:
+            agent = agents[state.current_player]
+            moves.append(agent.get_best_move(state))
+            nodes += agent.nodes
+        return time.perf_counter() - start, nodes, moves
+    finally:
+        for agent in agents.values():
+            agent.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=8)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    states = fixed_positions(args.positions)
+    print(f"{len(states)} positions, depth {args.depth}, {os.cpu_count()} CPUs")
+    serial = None
+    for workers in args.workers:
+        elapsed, nodes, moves = run(states, args.depth, workers)
+        if serial is None:
+            serial = elapsed
+        print(f"workers={workers:<3d} {elapsed:8.2f} s  {nodes:9d} nodes  speedup {serial / elapsed:5.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Perft: counts the positions reachable in exactly d moves (passes excluded)
+by walking the legal-move tree with GoProblem.actions and play()/undo().
+The counts depend only on the rules, so they are a deterministic check of
+the move generator and the make/unmake path, and the walk is a benchmark
+of both.
+
+--divide prints the count below every root move. --reference recounts with
+the deepcopy-based rules in bench/reference.py (actions/result) and fails
+on any difference. --workers N splits the root moves over N processes.
+
+Usage (from Task02/):
+    python -m bench.perft [--phase midgame] [--index 0] [--depth 3] [--divide] [--reference] [--workers N]
+"""
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game import GoState, GoProblem
+from bench.reference import ReferenceState, ReferenceProblem
+from bench.suite import CORPUS
+
+
+def perft(state, depth, problem=None):
+    """Number of move sequences of length `depth` from `state` (leaf positions)."""
+    if problem is None:
+        problem = GoProblem()
+    if depth == 0:
+        return 1
+    moves = problem.actions(state)
+    if depth == 1:
+        return len(moves)
+    count = 0
+    for move in moves:
+        problem.play(state, move)
+        count += perft(state, depth - 1, problem)
+        problem.undo(state)
+    return count
+
+
+def divide(state, depth, problem=None):
+    """[(root move, perft below it)] for depth >= 1."""
+    if problem is None:
+        problem = GoProblem()
+    counts = []
+    for move in problem.actions(state):
+        problem.play(state, move)
+        counts.append((move, perft(state, depth - 1, problem)))
+        problem.undo(state)
+    return counts
+
+
+def _divide_move(compact, move, depth):
+    state = GoState.from_compact(compact)
+    problem = GoProblem()
+    problem.play(state, move)
+    return move, perft(state, depth - 1, problem)
+
+
+def parallel_divide(state, depth, workers):
+    """divide() with the root moves spread over a process pool."""
+    compact = state.to_compact()
+    moves = GoProblem().actions(state)
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_divide_move, [compact] * len(moves), moves, [depth] * len(moves)))
+
+
+def reference_perft(state, depth, problem=None):
+    if problem is None:
+        problem = ReferenceProblem()
+    if depth == 0:
+        return 1
+    moves = problem.actions(state)
+    if depth == 1:
+        return len(moves)
+    return sum(reference_perft(problem.result(state, move), depth - 1, problem) for move in moves)
+
+
+def reference_divide(state, depth):
+    problem = ReferenceProblem()
+    return [(move, reference_perft(problem.result(state, move), depth - 1, problem))
+            for move in problem.actions(state)]
+
+
+def corpus_position(phase, index):
+    """The corpus position as a (GoState, ReferenceState) pair."""
+    with open(CORPUS) as f:
+        moves = json.load(f)[phase][index]
+    problem, ref_problem = GoProblem(), ReferenceProblem()
+    state, ref = GoState(), ReferenceState()
+    for move in moves:
+        move = tuple(move)
+        state = problem.result(state, move)
+        ref = ref_problem.result(ref, move)
+    return state, ref
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--phase', default='midgame', choices=('empty', 'opening', 'midgame', 'endgame'))
+    parser.add_argument('--index', type=int, default=0, help="position within the corpus phase")
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--divide', action='store_true', help="print the count below every root move")
+    parser.add_argument('--reference', action='store_true', help="check counts against bench/reference.py")
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.phase == 'empty':
+        state, ref = GoState(), ReferenceState()
+    else:
+        state, ref = corpus_position(args.phase, args.index)
+
+    # Counts per depth, the last one split by root move
+    for depth in range(1, args.depth):
+        start = time.perf_counter()
+        count = perft(state, depth)
+        elapsed = time.perf_counter() - start
+        print(f"perft({depth}) = {count:>12}  {elapsed:8.3f} s  {count / elapsed:10.0f} nodes/s")
+
+    start = time.perf_counter()
+    if args.workers > 1:
+        counts = parallel_divide(state, args.depth, args.workers)
+    else:
+        counts = divide(state, args.depth)
+    elapsed = time.perf_counter() - start
+    total = sum(n for _, n in counts)
+    if args.divide:
+        for move, n in counts:
+            print(f"  {move}: {n}")
+    print(f"perft({args.depth}) = {total:>12}  {elapsed:8.3f} s  {total / elapsed:10.0f} nodes/s"
+          + (f"  ({args.workers} workers)" if args.workers > 1 else ""))
+
+    if args.reference:
+        start = time.perf_counter()
+        expected = reference_divide(ref, args.depth)
+        elapsed = time.perf_counter() - start
+        print(f"reference perft({args.depth}) = {sum(n for _, n in expected)}  {elapsed:8.3f} s")
+        if expected != counts:
+            for (move, n), (ref_move, ref_n) in zip(counts, expected):
+                if (move, n) != (ref_move, ref_n):
+                    print(f"  mismatch: {move}: {n} vs reference {ref_move}: {ref_n}")
+            if len(expected) != len(counts):
+                print(f"  {len(counts)} root moves vs {len(expected)} in the reference")
+            return 1
+        print("counts match the reference")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
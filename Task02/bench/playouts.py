@@ -0,0 +1,42 @@
+"""
+Playout throughput: raw PlayoutBoard random games and full MCTSAgent
+iterations (selection, expansion, playout, backpropagation), in playouts/sec.
+
+Usage (from Task02/):  python -m bench.playouts [--seconds S]
+"""
+import argparse
+import random
+import time
+
+from game import GoState, GoProblem, MCTSAgent
+from game.playout import PlayoutBoard
+from bench.ordering import fixed_positions
+
+
+def raw_playouts(states, seconds, seed=0):
+    rng = random.Random(seed)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        PlayoutBoard.from_state(states[count % len(states)]).playout(rng)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    empty = [GoState()]
+    midgame = fixed_positions(8, min_moves=30, max_moves=50)
+    print(f"PlayoutBoard, empty board:  {raw_playouts(empty, args.seconds):8.0f} playouts/s")
+    print(f"PlayoutBoard, midgame:      {raw_playouts(midgame, args.seconds):8.0f} playouts/s")
+
+    agent = MCTSAgent(GoProblem(), time_limit=args.seconds, seed=0)
+    agent.get_best_move(midgame[0])
+    print(f"MCTSAgent, midgame:         {agent.last_search['playouts_per_sec']:8.0f} playouts/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Seeded random positions for the benchmarks: games of random legal moves
+from the empty board, so every run of a bench script sees the same
+positions.
+"""
+import random
+
+from game import GoState, GoProblem
+
+
+def random_game(rng, length, size=9, problem=None):
+    """(moves, final GoState) of up to `length` random legal moves; the game
+    stops early when no legal move is left."""
+    if problem is None:
+        problem = GoProblem()
+    state = GoState(size)
+    moves = []
+    for _ in range(length):
+        legal = problem.actions(state)
+        if not legal: break
+        move = rng.choice(legal)
+        moves.append(move)
+        state = problem.result(state, move)
+    return moves, state
+
+
+def random_positions(count, min_moves, max_moves, seed=0, size=9):
+    """[(moves, GoState)] of `count` random games of min_moves..max_moves moves."""
+    rng = random.Random(seed)
+    problem = GoProblem()
+    return [random_game(rng, rng.randint(min_moves, max_moves), size, problem) for _ in range(count)]
@@ -0,0 +1,122 @@
+"""
+Reference Go rules on a list-of-lists board, as GoState/GoProblem were
+originally written (deep-copied boards, flood-filled groups and a superko
+history of tuple snapshots). Kept for benchmarks and for checking that the
+optimised engine still produces identical move lists and positions.
+"""
+import copy
+from game.state import BLACK, WHITE, EMPTY, BOARD_SIZE
+
+
+class ReferenceState:
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.board = [[EMPTY for _ in range(size)] for _ in range(size)]
+        self.current_player = BLACK
+        self.captures = {BLACK: 0, WHITE: 0}
+        self.history = set()
+        self.history.add(self.get_board_hash())
+        self.last_move_was_pass = False
+        self.game_over = False
+
+    def get_board_hash(self):
+        return tuple(tuple(row) for row in self.board)
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def remove_dead_stones(self, board, r, c, color_to_check):
+        dead_stones = []
+        checked_groups = set()
+        for nr, nc in self.get_neighbors(r, c):
+            if board[nr][nc] == color_to_check:
+                group = self.get_group(board, nr, nc)
+                gid = tuple(sorted(list(group)))
+                if gid in checked_groups: continue
+                checked_groups.add(gid)
+                if self.has_zero_liberties(board, group):
+                    for dr, dc in group:
+                        board[dr][dc] = EMPTY
+                        dead_stones.append((dr, dc))
+        return dead_stones
+
+    def get_group(self, board, r, c):
+        color = board[r][c]
+        group = set()
+        stack = [(r, c)]
+        while stack:
+            cr, cc = stack.pop()
+            if (cr, cc) in group: continue
+            group.add((cr, cc))
+            for nr, nc in self.get_neighbors(cr, cc):
+                if board[nr][nc] == color: stack.append((nr, nc))
+        return group
+
+    def count_liberties(self, board, r, c):
+        group = self.get_group(board, r, c)
+        liberties = set()
+        for gr, gc in group:
+            for nr, nc in self.get_neighbors(gr, gc):
+                if board[nr][nc] == EMPTY: liberties.add((nr, nc))
+        return len(liberties)
+
+    def has_zero_liberties(self, board, group):
+        for r, c in group:
+            for nr, nc in self.get_neighbors(r, c):
+                if board[nr][nc] == EMPTY: return False
+        return True
+
+    def get_neighbors(self, r, c):
+        n = []
+        if r > 0: n.append((r - 1, c))
+        if r < self.size - 1: n.append((r + 1, c))
+        if c > 0: n.append((r, c - 1))
+        if c < self.size - 1: n.append((r, c + 1))
+        return n
+
+
+class ReferenceProblem:
+    def actions(self, state):
+        if state.game_over: return []
+        moves = []
+        for r in range(state.size):
+            for c in range(state.size):
+                if state.board[r][c] == EMPTY:
+                    if self.is_valid_move(state, r, c):
+                        moves.append((r, c))
+        return moves
+
+    def is_valid_move(self, state, r, c):
+        if not (0 <= r < state.size and 0 <= c < state.size): return False
+        if state.board[r][c] != EMPTY: return False
+        temp_board = copy.deepcopy(state.board)
+        temp_board[r][c] = state.current_player
+        opponent = WHITE if state.current_player == BLACK else BLACK
+        captured = state.remove_dead_stones(temp_board, r, c, opponent)
+        if not captured and state.count_liberties(temp_board, r, c) == 0:
+            return False
+        new_hash = tuple(tuple(row) for row in temp_board)
+        if new_hash in state.history:
+            return False
+        return True
+
+    def result(self, state, action):
+        new_state = state.copy()
+        opponent = WHITE if state.current_player == BLACK else BLACK
+        if action is None:
+            if new_state.last_move_was_pass:
+                new_state.game_over = True
+            new_state.last_move_was_pass = True
+            new_state.current_player = opponent
+            return new_state
+        r, c = action
+        new_state.board[r][c] = state.current_player
+        new_state.last_move_was_pass = False
+        captured = new_state.remove_dead_stones(new_state.board, r, c, opponent)
+        new_state.captures[state.current_player] += len(captured)
+        new_state.history.add(new_state.get_board_hash())
+        new_state.current_player = opponent
+        return new_state
+
+    def is_terminal(self, state):
+        return state.game_over
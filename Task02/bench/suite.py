@@ -0,0 +1,167 @@
+"""
+Benchmark suite for the engine's hot paths on a fixed corpus of 9x9
+positions (bench/corpus.json: move lists for opening, midgame and endgame
+positions, replayed from the empty board).
+
+Times, per phase: GoProblem.actions, GoProblem.result,
+GoState.calculate_score, RobustMinimaxAgent.heuristic (seconds per call)
+and a full get_best_move at depths 1-3 with a fresh agent (seconds per
+search). Each timing is the best of --repeat runs.
+
+Results are written as JSON. Given --baseline (an earlier --out file),
+every metric is compared with it and the run fails (exit status 1) if any
+is more than --threshold slower (0.25 = 25%).
+
+Usage (from Task02/):
+    python -m bench.suite --out baseline.json
+    python -m bench.suite --baseline baseline.json --threshold 0.25 [--out current.json]
+    python -m bench.suite --rebuild-corpus
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+from game import GoState, GoProblem, RobustMinimaxAgent, WHITE
+from bench.positions import random_game
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus.json')
+
+# Moves from the empty board for each phase, and positions per phase
+PHASES = {
+    'opening': (4, 12),
+    'midgame': (25, 45),
+    'endgame': (60, 90),
+}
+PER_PHASE = 8
+SEARCH_DEPTHS = (1, 2, 3)
+
+
+def build_corpus(seed=2024):
+    """Random legal games cut at each phase's move range."""
+    rng = random.Random(seed)
+    problem = GoProblem()
+    corpus = {}
+    for phase, (lo, hi) in PHASES.items():
+        games = []
+        while len(games) < PER_PHASE:
+            moves, state = random_game(rng, rng.randint(lo, hi), problem=problem)
+            if not state.game_over:
+                games.append([list(move) for move in moves])
+        corpus[phase] = games
+    return corpus
+
+
+def load_corpus(path=CORPUS):
+    """{phase: [GoState]} replayed from the stored move lists."""
+    with open(path) as f:
+        corpus = json.load(f)
+    problem = GoProblem()
+    positions = {}
+    for phase, games in corpus.items():
+        states = []
+        for moves in games:
+            state = GoState()
+            for move in moves:
+                state = problem.result(state, tuple(move) if move else None)
+            states.append(state)
+        positions[phase] = states
+    return positions
+
+
+def best_time(fn, states, repeat, inner=1):
+    """Best over `repeat` runs of the mean seconds per fn(state) call."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(inner):
+            for state in states:
+                fn(state)
+        best = min(best, (time.perf_counter() - start) / (inner * len(states)))
+    return best
+
+
+def run(positions, repeat, depths=SEARCH_DEPTHS):
+    problem = GoProblem()
+    results = {}
+    for phase, states in positions.items():
+        first_moves = [problem.actions(s)[0] for s in states]
+        agent = RobustMinimaxAgent(problem, ai_color=WHITE)
+        results[f'{phase}.actions'] = best_time(problem.actions, states, repeat, inner=20)
+        pairs = list(zip(states, first_moves))
+        results[f'{phase}.result'] = best_time(lambda sm: problem.result(*sm), pairs, repeat, inner=20)
+        results[f'{phase}.calculate_score'] = best_time(lambda s: s.calculate_score(), states, repeat, inner=10)
+        results[f'{phase}.heuristic'] = best_time(agent.heuristic, states, repeat, inner=200)
+        for depth in depths:
+            def search(state):
+                RobustMinimaxAgent(problem, depth=depth, ai_color=state.current_player).get_best_move(state)
+            results[f'{phase}.get_best_move.d{depth}'] = best_time(search, states, repeat)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Prints every metric against the baseline; returns the regressed ones."""
+    failed = []
+    for name, value in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"  {name:<32} {value * 1e6:12.1f} us   (not in baseline)")
+            continue
+        ratio = value / old if old else float('inf')
+        mark = ''
+        if ratio > 1 + threshold:
+            failed.append(name)
+            mark = '  SLOWER'
+        print(f"  {name:<32} {value * 1e6:12.1f} us   {ratio:6.2f}x baseline{mark}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', help="write results as JSON to this file")
+    parser.add_argument('--baseline', help="JSON file of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown per metric before the run fails (default 0.25)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-depth', type=int, default=max(SEARCH_DEPTHS))
+    parser.add_argument('--rebuild-corpus', action='store_true', help="regenerate bench/corpus.json")
+    args = parser.parse_args(argv)
+
+    if args.rebuild_corpus:
+        with open(CORPUS, 'w') as f:
+            json.dump(build_corpus(), f)
+        print(f"wrote {CORPUS}")
+        return 0
+
+    positions = load_corpus()
+    results = run(positions, args.repeat, range(1, args.max_depth + 1))
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        failed = compare(results, baseline, args.threshold)
+        if failed:
+            print(f"{len(failed)} metric(s) more than {args.threshold:.0%} slower than the baseline: "
+                  + ', '.join(failed))
+            return 1
+        print("no regressions")
+    else:
+        for name, value in results.items():
+            print(f"  {name:<32} {value * 1e6:12.1f} us")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Scoring throughput: GoState.calculate_score() against the numpy engine in
+game.vectorized, one position at a time and as one batch, on 9x9, 13x13 and
+19x19 positions. Scores are checked to match before timing.
+
+Usage (from Task02/):  python -m bench.territory [--positions N]
+"""
+import argparse
+import time
+
+from game import BLACK, WHITE
+from game import vectorized
+from bench.positions import random_positions
+
+
+def normalized(result):
+    return {k: sorted(v) if isinstance(v, list) else v for k, v in result.items()}
+
+
+def positions_per_sec(fn, states, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(states)
+    return repeat * len(states) / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--positions', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>4} {'calculate_score':>16} {'numpy single':>13} {'numpy batch':>12}   (positions/s)")
+    for size in (9, 13, 19):
+        states = [state for _, state in random_positions(args.positions, size * size // 3, size * size,
+                                                         seed=1, size=size)]
+        batch = vectorized.score_batch(states)
+        for state, (black, white) in zip(states, batch):
+            ref = state.calculate_score()
+            assert (ref[BLACK], ref[WHITE]) == (black, white)
+            assert normalized(ref) == normalized(vectorized.calculate_score(state))
+
+        scalar = positions_per_sec(lambda ss: [s.calculate_score() for s in ss], states, args.repeat)
+        single = positions_per_sec(lambda ss: [vectorized.calculate_score(s) for s in ss], states, args.repeat)
+        batched = positions_per_sec(vectorized.score_batch, states, args.repeat)
+        print(f"{size:>4} {scalar:16.0f} {single:13.0f} {batched:12.0f}")
+
+
+if __name__ == '__main__':
+    main()
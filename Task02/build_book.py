@@ -0,0 +1,79 @@
+# build_book.py
+"""
+Builds an opening book (game.book) offline from game records.
+
+Inputs are SGF files or collections (*.sgf) and tournament.py output
+(*.jsonl); --self-play N first plays N games between --agent and itself
+with tournament.play_game. Every game's first --max-moves moves are counted
+per symmetry-normalized position, and the most played move of every position
+seen at least --min-count times goes in the book.
+
+Usage:
+    python build_book.py games.sgf games.jsonl --out opening.book
+    python build_book.py --self-play 200 --agent mcts:playouts=2000 --max-moves 8 --out opening.book
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from game import GoState, BookBuilder, BLACK, WHITE, BOARD_SIZE, sgf
+from tournament import play_game
+
+
+def sgf_games(path, size):
+    for game in sgf.iter_games(path):
+        if game.size != size or game.setup[BLACK] or game.setup[WHITE]:
+            continue
+        result = (game.result or '').upper()
+        winner = BLACK if result.startswith('B+') else WHITE if result.startswith('W+') else None
+        yield sgf.initial_state(game), [move for _, move in game.moves], winner
+
+
+def jsonl_games(path, size):
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            if record['size'] != size:
+                continue
+            moves = [tuple(move) if move else None for move in record['moves']]
+            yield GoState(size), moves, BLACK if record['winner'] == 'black' else WHITE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Builds an opening book from game records.")
+    parser.add_argument('inputs', nargs='*', help="*.sgf files or tournament.py *.jsonl output")
+    parser.add_argument('--out', default='opening.book')
+    parser.add_argument('--size', type=int, default=BOARD_SIZE)
+    parser.add_argument('--max-moves', type=int, default=12, help="book depth in moves")
+    parser.add_argument('--min-count', type=int, default=2, help="games a position needs to be in the book")
+    parser.add_argument('--self-play', type=int, default=0, metavar='N', help="self-play games to add")
+    parser.add_argument('--agent', default='mcts:playouts=2000', help="tournament.py agent spec for self-play")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    builder = BookBuilder(args.size, args.max_moves)
+    for path in args.inputs:
+        games = jsonl_games(path, args.size) if path.endswith('.jsonl') else sgf_games(path, args.size)
+        for state, moves, winner in games:
+            builder.add_game(state, moves, winner)
+        print(f"{path}: {builder.games} games so far", file=sys.stderr)
+
+    if args.self_play:
+        with ProcessPoolExecutor(args.workers) as pool:
+            # Played to the end so that the winner counts
+            futures = [pool.submit(play_game, i, args.agent, args.agent, args.size, 3 * args.size * args.size,
+                                   args.seed + 2 * i) for i in range(args.self_play)]
+            for future in futures:
+                record = future.result()
+                moves = [tuple(move) if move else None for move in record['moves']]
+                builder.add_game(GoState(args.size), moves, BLACK if record['winner'] == 'black' else WHITE)
+        print(f"self-play: {args.self_play} games", file=sys.stderr)
+
+    book = builder.save(args.out, args.min_count)
+    print(f"wrote {len(book)} positions from {builder.games} games to {args.out}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,21 @@
-from .state import GoState, BLACK, WHITE, EMPTY, BOARD_SIZE, KOMI
+from .state import GoState, BLACK, WHITE, EMPTY, BOARD_SIZE, KOMI, LEGAL, OCCUPIED, SUICIDE, KO
 from .problem import Problem, GoProblem
 from .node import Node
-from .agent import Agent, MinimaxAgent, RobustMinimaxAgent
+from .agent import Agent, MinimaxAgent, RobustMinimaxAgent, MCTSAgent
+from .ordering import MoveOrderer
+from .ttable import TranspositionTable
+from .ponder import Ponderer
+from .job import SearchJob
+from .scoring import ScoreKeeper
+from .book import OpeningBook, BookBuilder
+from . import sgf
 
 __all__ = [
     'GoState', 'BLACK', 'WHITE', 'EMPTY', 'BOARD_SIZE', 'KOMI',
+    'LEGAL', 'OCCUPIED', 'SUICIDE', 'KO',
     'Problem', 'GoProblem',
     'Node',
-    'Agent', 'MinimaxAgent', 'RobustMinimaxAgent'
+    'Agent', 'MinimaxAgent', 'RobustMinimaxAgent', 'MCTSAgent',
+    'MoveOrderer', 'TranspositionTable', 'Ponderer', 'SearchJob',
+    'ScoreKeeper', 'OpeningBook', 'BookBuilder', 'sgf'
 ]
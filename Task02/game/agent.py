@@ -1,6 +1,16 @@
 import math
+import os
+import random
+import time
 from .state import BLACK, WHITE, EMPTY
 from .node import Node
+from .playout import PlayoutBoard
+from .ttable import TranspositionTable, EXACT, LOWER, UPPER
+from .stats import SearchStats, TimedProblem
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out."""
+
 
 class Agent:
     def __init__(self):
@@ -20,19 +30,91 @@ class MinimaxAgent(Agent):
     - Alpha-Beta: Prunes branches that cannot affect final decision
     
     Pruning reduces nodes from O(b^d) to O(b^(d/2)) in best case.
+
+    Transposition table (tt_size entries, None to disable):
+    - Positions reached by different move orders are searched once
+    - Stores depth, value, bound type (exact/lower/upper) and best move
+    - Kept between get_best_move() calls, so each turn reuses the last one:
+      entries from the previous search stay valid, older ones are recycled
+      first, and last_search['tt_reused'] counts hits on carried-over entries
+
+    Time budget (time_limit seconds, None for a fixed depth):
+    - Iterative deepening: depth 1, 2, ... up to `depth`, each iteration
+      ordered by the previous one's root scores and the table's best moves
+    - Aborts mid-iteration at the deadline and plays the best move of the
+      deepest completed iteration
+    - last_search reports the depth reached, time used and nodes visited
+
+    Move ordering (ordering=MoveOrderer() or any object with the same
+    new_search/order/cutoff methods; None tries the table's move first and
+    the rest in raster order). Raster order is close to the worst case for
+    alpha-beta; good ordering is what brings it towards O(b^(d/2)).
+
+    Parallel root search (workers > 1):
+    - Root moves are spread over a ProcessPoolExecutor with a shared alpha
+    - Positions are sent as compact tuples (GoState.to_compact())
+    - workers=1 runs the serial search in-process and is deterministic
+    - Call close() to stop the worker processes
+
+    Setting `stop_event` (a threading.Event) lets another thread abort a
+    serial search the same way the deadline does; see game.ponder. While a
+    search runs, progress() can be polled from another thread.
+
+    stats=True collects a SearchStats for every get_best_move() call (nodes,
+    leaves and cutoffs per ply, branching factor, table hits, time per
+    operation), kept in last_stats and as last_search['stats']. When off, the
+    search pays one attribute check per node.
+
+    book=OpeningBook(...) answers book positions without searching (before
+    the empty-board centre move); out of book the search runs as usual.
     """
-    def __init__(self, problem, depth=3):
+    def __init__(self, problem, depth=3, tt_size=1 << 18, time_limit=None, ordering=None, workers=1,
+                 stats=False, book=None):
         super().__init__()
         self.problem = problem
         self.depth_limit = depth
+        self.time_limit = time_limit
+        self.ordering = ordering
+        self.workers = workers
+        self.tt_size = tt_size
+        self.root_depth = depth
+        self.executor = None
+        self.shared_alpha = None
+        self.searches = 0
+        # Kept across get_best_move() calls so each turn reuses the last one's work
+        self.tt = TranspositionTable(tt_size) if tt_size else None
+        self.deadline = None
+        self.stop_event = None
+        self.nodes = 0
+        self.progress_depth = 0
+        self.progress_move = None
+        self.collect_stats = stats
+        self.stats = None
+        self.last_stats = None
+        self.last_search = None
+        self.book = book
+        # What the search calls for moves and leaf values; start_stats()
+        # points these at timed wrappers without touching problem/heuristic
+        self._search_problem = problem
+        self._evaluate = self.heuristic
+
+    def progress(self):
+        """Deepest completed iteration, nodes so far and its best move."""
+        return {'depth': self.progress_depth, 'nodes': self.nodes, 'best_move': self.progress_move}
 
     def get_best_move(self, state):
+        self.last_search = None
+        self.last_stats = None
+        self.progress_depth = 0
+        self.progress_move = None
+        if self.book is not None:
+            move = self.book.lookup(state)
+            if move is not None:
+                return move
         # Optimization: Center move if empty
         if all(row.count(EMPTY) == state.size for row in state.board):
             return (state.size // 2, state.size // 2)
 
-        best_val = -math.inf
-        best_move = None
         moves = self.problem.actions(state)
 
         if not moves:
@@ -42,14 +124,109 @@ class MinimaxAgent(Agent):
         # If opponent passed, we check if our best move actually gains anything.
         # If not, we pass to end the game.
         current_state_val = self.heuristic(state)
+        opponent_passed = state.last_move_was_pass
         # ------------------------
 
+        # Search a private copy in place with play()/undo() instead of copying per node
+        state = state.copy()
+        if self.ordering is not None:
+            self.ordering.new_search()
+        reused_before = 0
+        if self.tt is not None:
+            self.tt.new_generation()
+            reused_before = self.tt.reused
+        moves = self.tt_ordered(state, moves)
+        start = time.perf_counter()
+        self.deadline = start + self.time_limit if self.time_limit else None
+        self.nodes = 0
+
+        # With a time budget, search depth 1, 2, 3, ... and keep the result of
+        # the deepest iteration that finished before the deadline.
+        depths = range(1, self.depth_limit + 1) if self.time_limit else (self.depth_limit,)
+        best_val, best_move, completed = -math.inf, moves[0], 0
+        self._search_problem, self._evaluate = self.problem, self.heuristic
+        if self.collect_stats:
+            self.start_stats()
+        try:
+            for depth in depths:
+                nodes_before = self.nodes
+                try:
+                    best_val, best_move, scores = self.search_root(state, moves, depth)
+                except SearchTimeout:
+                    break
+                completed = depth
+                self.progress_depth, self.progress_move = depth, best_move
+                if self.stats is not None:
+                    self.stats.iteration_nodes.append(self.nodes - nodes_before)
+                # Best moves of this iteration are searched first in the next one
+                moves = [move for _, move in sorted(scores, key=lambda sm: sm[0], reverse=True)]
+        finally:
+            if self.stats is not None:
+                self.finish_stats(time.perf_counter() - start)
+
+        self.deadline = None
+        self.last_search = {
+            'depth': completed,
+            'time': time.perf_counter() - start,
+            'nodes': self.nodes,
+            'tt_reused': self.tt.reused - reused_before if self.tt is not None else 0,
+        }
+        if self.last_stats is not None:
+            self.last_search['stats'] = self.last_stats.as_dict()
+
+        # Heuristic Pass decision (only on a finished iteration; running out of
+        # time before depth 1 is no reason to end the game):
+        if opponent_passed and completed:
+            if best_val < current_state_val + 0.5:
+                return None
+
+        return best_move
+
+    def start_stats(self):
+        """Points the search's private problem and evaluation hooks at timed
+        wrappers for one search."""
+        stats = self.stats = SearchStats()
+        self._search_problem = TimedProblem(self.problem, stats)
+        heuristic = self.heuristic
+        if self.tt is not None:
+            stats.tt_probes = -(self.tt.hits + self.tt.misses)
+            stats.tt_hits = -self.tt.hits
+
+        def timed_heuristic(state):
+            t = time.perf_counter()
+            val = heuristic(state)
+            stats.time_heuristic += time.perf_counter() - t
+            return val
+        self._evaluate = timed_heuristic
+
+    def finish_stats(self, elapsed):
+        stats = self.stats
+        stats.elapsed = elapsed
+        if self.tt is not None:
+            stats.tt_probes += self.tt.hits + self.tt.misses
+            stats.tt_hits += self.tt.hits
+        self._search_problem, self._evaluate = self.problem, self.heuristic
+        self.stats = None
+        self.last_stats = stats
+
+    def search_root(self, state, moves, depth):
+        """Searches every root move to `depth`. Returns (best value, best move, [(value, move)])."""
+        if self.workers > 1:
+            return self.parallel_search_root(state, moves, depth)
+        if self.stats is not None:
+            self.stats.node(0)
+        best_val = -math.inf
+        best_move = None
         alpha = -math.inf
         beta = math.inf
+        scores = []
+        self.root_depth = depth
 
         for move in moves:
-            next_state = self.problem.result(state, move)
-            val = self.min_value(next_state, self.depth_limit - 1, alpha, beta)
+            self._search_problem.play(state, move)
+            val = self.min_value(state, depth - 1, alpha, beta)
+            self._search_problem.undo(state)
+            scores.append((val, move))
 
             if val > best_val:
                 best_val = val
@@ -57,41 +234,212 @@ class MinimaxAgent(Agent):
 
             alpha = max(alpha, best_val)
 
-        # Heuristic Pass decision:
-        if state.last_move_was_pass:
-            if best_val < current_state_val + 0.5:
-                return None
+        if self.tt is not None:
+            self.tt.store(self.tt.key(state), depth, best_val, EXACT, best_move)
+        return best_val, best_move, scores
 
-        return best_move
+    def worker_kwargs(self):
+        """Constructor arguments for the serial agents run by worker processes.
+        Workers keep their own move orderer, so only its class and settings
+        are sent."""
+        ordering = None
+        if self.ordering is not None:
+            ordering = (type(self.ordering), self.ordering.settings())
+        return dict(depth=self.depth_limit, tt_size=self.tt_size, ordering=ordering)
+
+    def parallel_search_root(self, state, moves, depth):
+        """
+        Root splitting over a ProcessPoolExecutor: every root move is a task,
+        and workers share the best root score found so far as their alpha.
+        A move searched with alpha a that returns a value <= a is only an
+        upper bound, so the best move is chosen among values above their
+        alpha (ties go to the earlier move in `moves`).
+        """
+        if self.executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            from .parallel import init_worker
+            self.shared_alpha = multiprocessing.Value('d', -math.inf)
+            self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                                initargs=(self.shared_alpha,))
+        from .parallel import search_root_move
+
+        self.searches += 1
+        self.shared_alpha.value = -math.inf
+        agent_key = (os.getpid(), id(self))
+        search_id = (agent_key, self.searches)
+        compact = state.to_compact()
+        deadline = None
+        if self.deadline is not None:
+            deadline = time.time() + (self.deadline - time.perf_counter())
+        kwargs = self.worker_kwargs()
+        futures = [self.executor.submit(search_root_move, agent_key, type(self), kwargs,
+                                        search_id, compact, move, depth, deadline)
+                   for move in moves]
+
+        results = [f.result() for f in futures]
+        if any(r is None for r in results):
+            raise SearchTimeout()
+
+        best_val = -math.inf
+        best_move = None
+        scores = []
+        for val, alpha_used, move, nodes in results:
+            self.nodes += nodes
+            scores.append((val, move))
+            if val > alpha_used and val > best_val:
+                best_val = val
+                best_move = move
+        if best_move is None:
+            best_val, best_move = max(scores, key=lambda sm: sm[0])
+
+        if self.tt is not None:
+            self.tt.store(self.tt.key(state), depth, best_val, EXACT, best_move)
+        return best_val, best_move, scores
+
+    def close(self):
+        """Shuts down the worker processes of a parallel agent."""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    def check_time(self):
+        self.nodes += 1
+        if self.nodes & 127:
+            return
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+
+    def expected_reply(self, state):
+        """The move the last search expects from the side to move in `state`
+        (the table's best move for it), or None."""
+        if self.tt is None:
+            return None
+        entry = self.tt.probe(self.tt.key(state))
+        if entry is None or entry[4] is None:
+            return None
+        r, c = entry[4]
+        return entry[4] if self.problem.is_valid_move(state, r, c) else None
+
+    def tt_ordered(self, state, moves):
+        """Root moves ordered with the transposition table's best move for `state` first."""
+        tt_move = None
+        if self.tt is not None:
+            entry = self.tt.probe(self.tt.key(state))
+            if entry is not None:
+                tt_move = entry[4]
+        self.root_depth = 0
+        return self.order_moves(state, moves, 0, tt_move)
+
+    def order_moves(self, state, moves, depth, tt_move):
+        if self.ordering is not None:
+            return self.ordering.order(state, moves, self.root_depth - depth, tt_move)
+        if tt_move in moves:
+            moves = [tt_move] + [m for m in moves if m != tt_move]
+        return moves
 
     def max_value(self, state, depth, alpha, beta):
-        if depth == 0 or self.problem.is_terminal(state):
-            return self.heuristic(state)
+        self.check_time()
+        stats = self.stats
+        if stats is not None:
+            stats.node(self.root_depth - depth)
+        if depth == 0 or self._search_problem.is_terminal(state):
+            if stats is not None: stats.leaves[self.root_depth - depth] += 1
+            return self._evaluate(state)
+
+        tt = self.tt
+        tt_move = None
+        if tt is not None:
+            key = tt.key(state)
+            entry = tt.probe(key)
+            if entry is not None:
+                _, e_depth, e_val, e_flag, tt_move, _ = entry
+                if e_depth >= depth:
+                    if e_flag == EXACT: return e_val
+                    if e_flag == LOWER and e_val >= beta: return e_val
+                    if e_flag == UPPER and e_val <= alpha: return e_val
 
         v = -math.inf
-        moves = self.problem.actions(state)
-        if not moves: return self.heuristic(state)
+        moves = self._search_problem.actions(state)
+        if not moves:
+            if stats is not None: stats.leaves[self.root_depth - depth] += 1
+            return self._evaluate(state)
+        moves = self.order_moves(state, moves, depth, tt_move)
 
+        alpha_orig = alpha
+        best_move = None
         for move in moves:
-            v = max(v, self.min_value(self.problem.result(state, move), depth - 1, alpha, beta))
-            if v >= beta: return v
+            self._search_problem.play(state, move)
+            val = self.min_value(state, depth - 1, alpha, beta)
+            self._search_problem.undo(state)
+            if val > v:
+                v = val
+                best_move = move
+            if v >= beta:
+                if stats is not None: self.count_cutoff(stats, depth, move is moves[0])
+                if tt is not None: tt.store(key, depth, v, LOWER, best_move)
+                if self.ordering is not None: self.ordering.cutoff(state, move, self.root_depth - depth, depth)
+                return v
             alpha = max(alpha, v)
+        if tt is not None:
+            tt.store(key, depth, v, EXACT if v > alpha_orig else UPPER, best_move)
         return v
 
     def min_value(self, state, depth, alpha, beta):
-        if depth == 0 or self.problem.is_terminal(state):
-            return self.heuristic(state)
+        self.check_time()
+        stats = self.stats
+        if stats is not None:
+            stats.node(self.root_depth - depth)
+        if depth == 0 or self._search_problem.is_terminal(state):
+            if stats is not None: stats.leaves[self.root_depth - depth] += 1
+            return self._evaluate(state)
+
+        tt = self.tt
+        tt_move = None
+        if tt is not None:
+            key = tt.key(state)
+            entry = tt.probe(key)
+            if entry is not None:
+                _, e_depth, e_val, e_flag, tt_move, _ = entry
+                if e_depth >= depth:
+                    if e_flag == EXACT: return e_val
+                    if e_flag == LOWER and e_val >= beta: return e_val
+                    if e_flag == UPPER and e_val <= alpha: return e_val
 
         v = math.inf
-        moves = self.problem.actions(state)
-        if not moves: return self.heuristic(state)
+        moves = self._search_problem.actions(state)
+        if not moves:
+            if stats is not None: stats.leaves[self.root_depth - depth] += 1
+            return self._evaluate(state)
+        moves = self.order_moves(state, moves, depth, tt_move)
 
+        beta_orig = beta
+        best_move = None
         for move in moves:
-            v = min(v, self.max_value(self.problem.result(state, move), depth - 1, alpha, beta))
-            if v <= alpha: return v
+            self._search_problem.play(state, move)
+            val = self.max_value(state, depth - 1, alpha, beta)
+            self._search_problem.undo(state)
+            if val < v:
+                v = val
+                best_move = move
+            if v <= alpha:
+                if stats is not None: self.count_cutoff(stats, depth, move is moves[0])
+                if tt is not None: tt.store(key, depth, v, UPPER, best_move)
+                if self.ordering is not None: self.ordering.cutoff(state, move, self.root_depth - depth, depth)
+                return v
             beta = min(beta, v)
+        if tt is not None:
+            tt.store(key, depth, v, EXACT if v < beta_orig else LOWER, best_move)
         return v
 
+    def count_cutoff(self, stats, depth, first):
+        ply = self.root_depth - depth
+        stats.cutoffs[ply] += 1
+        if first:
+            stats.first_cutoffs[ply] += 1
+
     def heuristic(self, state):
         return 0
 
@@ -107,21 +455,30 @@ class RobustMinimaxAgent(MinimaxAgent):
     
     With depth L=2:
     - Nodes explored: O(b^2) ≈ 50^2 = 2,500 states (average case)
-    - Response time: <1 second for acceptable user experience
+    - Response time: well under 0.1 second with in-place play()/undo() search
     - Look-ahead: AI considers opponent's immediate response
     
     Trade-offs:
     - L=1: Too shallow, makes weak tactical moves
     - L=2: Good balance of tactical awareness and speed ✓
-    - L=3: ~125,000 nodes, 3-5 second delays (poor UX)
+    - L=3: ~125,000 nodes before pruning, ~0.1-1 second with play()/undo()
     - L=4+: Computationally prohibitive without advanced optimizations
     
     Depth=2 provides sufficient tactical planning while maintaining
-    real-time gameplay experience.
+    real-time gameplay experience. Given a time_limit, depth becomes the
+    cap for iterative deepening instead, so simple positions are searched
+    deeper while complex ones stay within the budget.
     """
-    def __init__(self, problem, depth=2, ai_color=WHITE):
-        super().__init__(problem, depth)
+    def __init__(self, problem, depth=2, ai_color=WHITE, tt_size=1 << 18, time_limit=None, ordering=None,
+                 incremental=True, workers=1, stats=False, book=None):
+        super().__init__(problem, depth, tt_size, time_limit, ordering, workers, stats, book)
         self.ai_color = ai_color
+        self.incremental = incremental
+
+    def worker_kwargs(self):
+        kwargs = super().worker_kwargs()
+        kwargs.update(ai_color=self.ai_color, incremental=self.incremental)
+        return kwargs
 
     def heuristic(self, state):
         """
@@ -154,7 +511,8 @@ class RobustMinimaxAgent(MinimaxAgent):
         ✓ Admissible: Does not overestimate true game value
         ✓ Consistent: h(n) ≤ cost(n,a,n') + h(n') for all states
         ✓ Domain-specific: Reflects Go strategy (territory + capture + shape)
-        ✓ Efficient: O(n²) computation for n×n board
+        ✓ Efficient: O(1) from counters GoState maintains incrementally
+          (incremental=False: one flood fill per group, O(n²) per call)
         ✓ Informative: Differentiates between strong/weak positions
         
         JUSTIFICATION:
@@ -172,19 +530,14 @@ class RobustMinimaxAgent(MinimaxAgent):
         """
         black_score = state.captures[BLACK] * 10
         white_score = state.captures[WHITE] * 10
-        black_liberties = 0
-        white_liberties = 0
-        stones_diff = 0
 
-        for r in range(state.size):
-            for c in range(state.size):
-                cell = state.board[r][c]
-                if cell == BLACK:
-                    stones_diff += 1
-                    black_liberties += state.count_liberties(state.board, r, c)
-                elif cell == WHITE:
-                    stones_diff -= 1
-                    white_liberties += state.count_liberties(state.board, r, c)
+        if self.incremental:
+            # O(1): GoState keeps these counters up to date on every move and undo
+            stones_diff = state.stone_counts[BLACK] - state.stone_counts[WHITE]
+            black_liberties = state.liberty_sums[BLACK]
+            white_liberties = state.liberty_sums[WHITE]
+        else:
+            stones_diff, black_liberties, white_liberties = self.scan_groups(state)
 
         # Heuristic: Material + Territory Proxy + Shape Health
         val = (black_score - white_score) + (stones_diff * 1.0) + (black_liberties - white_liberties) * 0.2
@@ -194,3 +547,221 @@ class RobustMinimaxAgent(MinimaxAgent):
         if self.ai_color == WHITE:
             return -val
         return val
+
+    def evaluate_batch(self, states):
+        """
+        heuristic() for many positions at once: stacks the boards into an
+        (N, size, size) int8 array and computes captures, stone difference and
+        liberty difference with numpy (game.vectorized). Returns a float array.
+        Needs numpy; the search itself keeps using the O(1) scalar heuristic.
+        """
+        import numpy as np
+        from .vectorized import stack_boards
+        if not states:
+            return np.zeros(0)
+        captures = np.array([state.captures[BLACK] - state.captures[WHITE] for state in states])
+        return self.evaluate_boards(stack_boards(states), captures)
+
+    def evaluate_boards(self, boards, capture_diff):
+        """evaluate_batch() on arrays: `boards` (N, size, size) and Black's
+        capture lead per board (e.g. a PositionCorpus's boards and captures)."""
+        from .vectorized import group_terms
+        stones_diff, black_liberties, white_liberties = group_terms(boards)
+        val = capture_diff * 10 + stones_diff * 1.0 + (black_liberties - white_liberties) * 0.2
+        if self.ai_color == WHITE:
+            return -val
+        return val
+
+    def scan_groups(self, state):
+        """
+        Non-incremental fallback for the heuristic terms: flood-fills the board
+        once, visiting each group exactly once. Every stone counts its group's
+        liberties, so a group adds size * liberties.
+        Returns (stones_diff, black_liberties, white_liberties).
+        """
+        board = [list(row) for row in state.board]
+        liberties = {BLACK: 0, WHITE: 0}
+        stones_diff = 0
+        visited = set()
+        for r in range(state.size):
+            for c in range(state.size):
+                cell = board[r][c]
+                if cell == EMPTY or (r, c) in visited: continue
+                group = state.get_group(board, r, c)
+                visited |= group
+                libs = set()
+                for gr, gc in group:
+                    for nr, nc in state.get_neighbors(gr, gc):
+                        if board[nr][nc] == EMPTY: libs.add((nr, nc))
+                liberties[cell] += len(group) * len(libs)
+                stones_diff += len(group) if cell == BLACK else -len(group)
+        return stones_diff, liberties[BLACK], liberties[WHITE]
+
+
+class MCTSAgent(Agent):
+    """
+    MONTE CARLO TREE SEARCH (UCT)
+    =============================
+
+    Builds a search tree of Node objects, one playout per iteration:
+    1. Selection: descend by UCB1, wins/visits + C * sqrt(ln N / visits)
+    2. Expansion: add one untried legal move as a child (via GoProblem.result)
+    3. Simulation: play the position out randomly on a PlayoutBoard, a
+       lightweight board with no history that avoids filling own eyes
+    4. Backpropagation: every node on the path counts the visit, and a win
+       if the player who moved into it won the playout
+
+    Budget: `playouts` iterations, or `time_limit` seconds when given.
+    The most visited root move is played. last_search reports playouts,
+    time, playouts/sec and reused nodes.
+
+    Tree reuse: the tree is kept after each move. On the next call the new
+    position is looked up among the old root's children and grandchildren
+    (our move, then the opponent's reply); that subtree becomes the root
+    with its statistics and the rest of the tree is dropped.
+
+    Setting `stop_event` (a threading.Event) ends the playout loop early.
+    While a search runs, progress() can be polled from another thread.
+    """
+    def __init__(self, problem, playouts=1000, time_limit=None, exploration=1.4, seed=None, reuse_tree=True):
+        super().__init__()
+        self.problem = problem
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.reuse_tree = reuse_tree
+        self.root = None
+        self.reused_nodes = 0
+        self.stop_event = None
+        self.playouts_done = 0
+        self.last_search = None
+
+    def progress(self):
+        """Playouts so far and the most visited root move."""
+        root = self.root
+        best = max(root.children, key=lambda child: child.visits, default=None) if root else None
+        return {'playouts': self.playouts_done, 'best_move': best.action if best else None}
+
+    def get_best_move(self, state):
+        self.last_search = None
+        if not self.problem.actions(state):
+            self.root = None
+            return None
+
+        root = self.advance_root(state) if self.reuse_tree else None
+        reused = 0
+        if root is None:
+            root = Node(state.copy())
+        else:
+            reused = self.subtree_size(root)
+            self.reused_nodes += reused
+        self.root = root
+        self.playouts_done = 0
+        start = time.perf_counter()
+        deadline = start + self.time_limit if self.time_limit else None
+        playouts = 0
+        while True:
+            if deadline is not None:
+                if time.perf_counter() >= deadline: break
+            elif playouts >= self.playouts:
+                break
+            if playouts and self.stop_event is not None and self.stop_event.is_set():
+                break
+            self.run_playout(root)
+            playouts += 1
+            self.playouts_done = playouts
+        if not root.children:
+            # Nothing fitted in the budget: one playout gives a move to play
+            self.run_playout(root)
+            playouts += 1
+        elapsed = time.perf_counter() - start
+
+        best = max(root.children, key=lambda child: child.visits)
+        self.last_search = {
+            'playouts': playouts,
+            'time': elapsed,
+            'playouts_per_sec': playouts / elapsed if elapsed else 0.0,
+            'win_rate': best.wins / best.visits,
+            'reused_nodes': reused,
+        }
+
+        # The opponent passed and we are already winning: pass to end the game
+        if state.last_move_was_pass and state.calculate_score()['winner'] == state.current_player:
+            return None
+        return best.action
+
+    def advance_root(self, state):
+        """Returns the node of the kept tree holding `state` (the old root, one of
+        its children or grandchildren), detached from its parent, or None."""
+        node = self.find_node(state)
+        if node is not None:
+            node.parent = None
+        return node
+
+    def find_node(self, state):
+        """The node holding `state` among the kept root, its children and grandchildren."""
+        if self.root is None:
+            return None
+        level = [self.root]
+        for _ in range(3):
+            for node in level:
+                s = node.state
+                if (s.hash == state.hash and s.current_player == state.current_player
+                        and s.captures == state.captures):
+                    return node
+            level = [child for node in level for child in node.children]
+        return None
+
+    def expected_reply(self, state):
+        """The most visited move from `state` in the kept tree, or None."""
+        node = self.find_node(state)
+        if node is None or not node.children:
+            return None
+        return max(node.children, key=lambda child: child.visits).action
+
+    @staticmethod
+    def subtree_size(node):
+        size = 0
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            size += 1
+            stack.extend(n.children)
+        return size
+
+    def run_playout(self, root):
+        node = root
+
+        # Selection
+        while True:
+            if node.untried_actions is None:
+                node.untried_actions = self.problem.actions(node.state)
+                self.rng.shuffle(node.untried_actions)
+            if node.untried_actions or not node.children:
+                break
+            node = self.select_child(node)
+
+        # Expansion
+        if node.untried_actions:
+            action = node.untried_actions.pop()
+            child = Node(self.problem.result(node.state, action), node, action, node.path_cost + 1)
+            node.children.append(child)
+            node = child
+
+        # Simulation
+        winner = PlayoutBoard.from_state(node.state).playout(self.rng)
+
+        # Backpropagation
+        while node.parent is not None:
+            node.visits += 1
+            if node.parent.state.current_player == winner:
+                node.wins += 1
+            node = node.parent
+        node.visits += 1
+
+    def select_child(self, node):
+        log_n = math.log(node.visits)
+        c = self.exploration
+        return max(node.children,
+                   key=lambda child: child.wins / child.visits + c * math.sqrt(log_n / child.visits))
@@ -0,0 +1,192 @@
+import sys
+import struct
+from array import array
+
+from .state import BLACK, WHITE, LEGAL, zobrist_table
+from .problem import GoProblem
+from .ttable import SIDE_KEY
+
+# Book file: header (magic, size, max moves, bytes per move, count), then
+# `count` position keys (uint64) and `count` moves (flat point index in the
+# canonical orientation; uint8, or uint16 on boards over 16x16), all
+# little-endian
+BOOK_MAGIC = b'GOBOOK'
+BOOK_HEADER = struct.Struct('<6sBBBI')
+MOVE_TYPES = {1: 'B', 2: 'H'}
+
+_SYMMETRIES = {}
+
+
+def symmetries(size):
+    """
+    The 8 board symmetries as (perms, inverses, keys): perms[s][p] is where
+    point p goes under symmetry s, inverses[s] maps it back, and keys[s] holds
+    the Zobrist tables permuted the same way, so keys[s][color][p] is the key
+    of a `color` stone on perms[s][p].
+    """
+    table = _SYMMETRIES.get(size)
+    if table is None:
+        n = size - 1
+        transforms = (
+            lambda r, c: (r, c), lambda r, c: (c, n - r), lambda r, c: (n - r, n - c), lambda r, c: (n - c, r),
+            lambda r, c: (r, n - c), lambda r, c: (n - r, c), lambda r, c: (c, r), lambda r, c: (n - c, n - r),
+        )
+        zobrist = zobrist_table(size)
+        perms, inverses, keys = [], [], []
+        for transform in transforms:
+            perm = []
+            for p in range(size * size):
+                r, c = transform(*divmod(p, size))
+                perm.append(r * size + c)
+            inverse = [0] * len(perm)
+            for p, q in enumerate(perm):
+                inverse[q] = p
+            perms.append(tuple(perm))
+            inverses.append(tuple(inverse))
+            keys.append((None,
+                         tuple(zobrist[BLACK][q] for q in perm),
+                         tuple(zobrist[WHITE][q] for q in perm)))
+        table = (tuple(perms), tuple(inverses), tuple(keys))
+        _SYMMETRIES[size] = table
+    return table
+
+
+def canonical_key(state):
+    """(key, s): the smallest Zobrist key of the position over the 8
+    symmetries, with the side to move folded in, and the symmetry s giving it."""
+    _, _, keys = symmetries(state.size)
+    black = []
+    white = []
+    for p, v in enumerate(state._cells):
+        if v == BLACK: black.append(p)
+        elif v: white.append(p)
+    best, best_s = None, 0
+    for s, (_, black_keys, white_keys) in enumerate(keys):
+        h = 0
+        for p in black: h ^= black_keys[p]
+        for p in white: h ^= white_keys[p]
+        if best is None or h < best:
+            best, best_s = h, s
+    if state.current_player == WHITE:
+        best ^= SIDE_KEY
+    return best, best_s
+
+
+class OpeningBook:
+    """
+    Book moves for the first moves of the game, keyed by canonical_key(), so
+    the 8 rotations and reflections of a position share one entry. Moves are
+    stored in the canonical orientation and mapped back to the position's
+    own on lookup.
+
+    A book given a path is read on the first lookup. `lookups` and `hits`
+    count lookup() calls and book moves returned; positions with more than
+    `max_moves` stones are misses without hashing.
+    """
+    def __init__(self, path=None, size=None, max_moves=0, entries=None):
+        self.path = path
+        self.size = size
+        self.max_moves = max_moves
+        self.entries = entries
+        self.lookups = 0
+        self.hits = 0
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def __len__(self):
+        self.load()
+        return len(self.entries)
+
+    def load(self):
+        if self.entries is not None:
+            return
+        with open(self.path, 'rb') as f:
+            magic, size, max_moves, width, count = BOOK_HEADER.unpack(f.read(BOOK_HEADER.size))
+            if magic != BOOK_MAGIC or width not in MOVE_TYPES:
+                raise ValueError(f"{self.path} is not an opening book")
+            keys = array('Q')
+            keys.fromfile(f, count)
+            moves = array(MOVE_TYPES[width])
+            moves.fromfile(f, count)
+        if sys.byteorder == 'big':
+            keys.byteswap()
+            moves.byteswap()
+        self.size = size
+        self.max_moves = max_moves
+        self.entries = dict(zip(keys, moves))
+
+    def save(self, path):
+        self.load()
+        items = sorted(self.entries.items())
+        width = 1 if self.size * self.size <= 256 else 2
+        keys = array('Q', [k for k, _ in items])
+        moves = array(MOVE_TYPES[width], [m for _, m in items])
+        if sys.byteorder == 'big':
+            keys.byteswap()
+            moves.byteswap()
+        with open(path, 'wb') as f:
+            f.write(BOOK_HEADER.pack(BOOK_MAGIC, self.size, self.max_moves, width, len(items)))
+            keys.tofile(f)
+            moves.tofile(f)
+
+    def lookup(self, state):
+        """The book move (r, c) for `state`, or None when out of book."""
+        self.lookups += 1
+        if self.entries is None:
+            self.load()
+        if state.size != self.size or state.stone_counts[BLACK] + state.stone_counts[WHITE] > self.max_moves:
+            return None
+        key, s = canonical_key(state)
+        q = self.entries.get(key)
+        if q is None:
+            return None
+        r, c = divmod(symmetries(state.size)[1][s][q], state.size)
+        if state.classify_move(r, c) != LEGAL:
+            return None
+        self.hits += 1
+        return r, c
+
+
+class BookBuilder:
+    """
+    Collects the moves played in the first `max_moves` moves of many games
+    (self-play records, SGF collections) and keeps, per canonical position,
+    the move played most often, ties going to the one that won more games.
+    """
+    def __init__(self, size, max_moves=12):
+        self.size = size
+        self.max_moves = max_moves
+        self.counts = {}
+        self.games = 0
+        self.problem = GoProblem()
+
+    def add_game(self, state, moves, winner=None):
+        """Replays `moves` ((r, c) or None) from `state` (not modified)."""
+        state = state.copy()
+        perms = symmetries(self.size)[0]
+        for move in moves[:self.max_moves]:
+            if move is None:
+                break
+            key, s = canonical_key(state)
+            q = perms[s][move[0] * self.size + move[1]]
+            stats = self.counts.setdefault(key, {}).setdefault(q, [0, 0])
+            stats[0] += 1
+            stats[1] += winner == state.current_player
+            self.problem.play(state, move)
+        self.games += 1
+
+    def build(self, min_count=1):
+        """An OpeningBook of the positions seen at least min_count times."""
+        entries = {}
+        for key, moves in self.counts.items():
+            q, (count, _) = max(moves.items(), key=lambda item: item[1])
+            if count >= min_count:
+                entries[key] = q
+        return OpeningBook(size=self.size, max_moves=self.max_moves, entries=entries)
+
+    def save(self, path, min_count=1):
+        book = self.build(min_count)
+        book.save(path)
+        return book
@@ -0,0 +1,196 @@
+"""
+Position corpora on disk for offline analysis: fixed-width records in one
+file that is memory-mapped, so millions of positions can be sliced without
+being read or unpickled. Requires numpy, like game.vectorized.
+
+File layout: an 8-byte header (MAGIC and the board size as uint16), then
+records of record_dtype(size):
+
+    key        uint64               Zobrist key (GoState.hash)
+    captures   uint16[2]            Black, White captures
+    ko         int16                ko point (flat index), -1 for none
+    player     uint8                side to move
+    flags      uint8                1 = last move passed, 2 = game over
+    board      int8[size, size]     GoState cell values
+
+The board is stored a byte per point rather than packed (GoState.to_bytes()
+is the 2-bit form) so that PositionCorpus.boards is a plain (N, size, size)
+int8 view of the mapped file and the batch functions in game.vectorized run
+over it without copying or decoding. Records are appended, so the count is
+the file size divided by the record size.
+"""
+import os
+
+import numpy as np
+
+from .state import GoState, BLACK, WHITE
+from .vectorized import score_boards, group_terms
+
+MAGIC = b'GOPOS1'
+HEADER_SIZE = 8
+
+
+def record_dtype(size):
+    return np.dtype([
+        ('key', '<u8'),
+        ('captures', '<u2', (2,)),
+        ('ko', '<i2'),
+        ('player', 'u1'),
+        ('flags', 'u1'),
+        ('board', 'i1', (size, size)),
+    ])
+
+
+def to_records(states):
+    """Structured array of the states (all of one board size)."""
+    size = states[0].size
+    records = np.zeros(len(states), dtype=record_dtype(size))
+    records['key'] = [state.hash for state in states]
+    records['captures'] = [(state.captures[BLACK], state.captures[WHITE]) for state in states]
+    records['ko'] = [-1 if state.ko_point is None else state.ko_point for state in states]
+    records['player'] = [state.current_player for state in states]
+    records['flags'] = [state.last_move_was_pass | (state.game_over << 1) for state in states]
+    data = b''.join(bytes(state._cells) for state in states)
+    records['board'] = np.frombuffer(data, dtype=np.int8).reshape(len(states), size, size)
+    return records
+
+
+class CorpusWriter:
+    """
+    Appends positions to a corpus file, creating it with its header when
+    needed. Positions are buffered and written `batch` at a time.
+
+        with CorpusWriter('positions.bin') as out:
+            for state in sgf.replay(game, positions=True):
+                out.add(state)
+    """
+    def __init__(self, path, size=None, batch=4096):
+        self.path = path
+        self.size = size
+        self.batch = batch
+        self.pending = []
+        self.written = 0
+        self.file = None
+
+    def add(self, state):
+        if self.size is None:
+            self.size = state.size
+        elif state.size != self.size:
+            raise ValueError(f"{state.size}x{state.size} position in a {self.size}x{self.size} corpus")
+        self.pending.append(state)
+        if len(self.pending) >= self.batch:
+            self.flush()
+
+    def extend(self, states):
+        for state in states:
+            self.add(state)
+
+    def flush(self):
+        if not self.pending:
+            return
+        if self.file is None:
+            self.file = self._open()
+        self.file.write(to_records(self.pending).tobytes())
+        self.written += len(self.pending)
+        self.pending = []
+
+    def _open(self):
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            size = read_header(self.path)
+            if size != self.size:
+                raise ValueError(f"{self.path} holds {size}x{size} positions, not {self.size}x{self.size}")
+            return open(self.path, 'ab')
+        f = open(self.path, 'wb')
+        f.write(MAGIC + np.uint16(self.size).tobytes())
+        return f
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_corpus(path, states):
+    """Writes the states as a new corpus file. Returns the number written."""
+    if os.path.exists(path):
+        os.remove(path)
+    with CorpusWriter(path) as out:
+        out.extend(states)
+    return out.written
+
+
+def read_header(path):
+    """Board size of a corpus file."""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a position corpus")
+    return int(np.frombuffer(header, dtype='<u2', offset=len(MAGIC))[0])
+
+
+class PositionCorpus:
+    """
+    Read-only memory-mapped view of a corpus file. `records` is the
+    structured array; `boards`, `captures` and `keys` are views of its
+    fields, so slicing them reads only the pages touched.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.size = read_header(path)
+        dtype = record_dtype(self.size)
+        count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+        if count:
+            self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def boards(self):
+        return self.records['board']
+
+    @property
+    def captures(self):
+        return self.records['captures']
+
+    @property
+    def keys(self):
+        return self.records['key']
+
+    def state(self, i):
+        """Record i as a GoState (superko history: the position itself only)."""
+        record = self.records[i]
+        flags = int(record['flags'])
+        ko = int(record['ko'])
+        return GoState.from_cells(self.size, record['board'].ravel().tolist(), int(record['player']),
+                                  tuple(int(n) for n in record['captures']), bool(flags & 1), bool(flags & 2),
+                                  None if ko < 0 else ko)
+
+    def batches(self, batch_size=65536):
+        """(start, records) slices of at most batch_size positions."""
+        for start in range(0, len(self.records), batch_size):
+            yield start, self.records[start:start + batch_size]
+
+    def score(self, start=0, stop=None):
+        """calculate_score() totals, (N, 2), for records[start:stop]."""
+        records = self.records[start:stop]
+        return score_boards(records['board'], records['captures'])
+
+    def group_terms(self, start=0, stop=None):
+        """RobustMinimaxAgent's heuristic terms for records[start:stop]."""
+        return group_terms(self.records[start:stop]['board'])
+
+    def evaluate(self, agent, start=0, stop=None):
+        """agent.evaluate_boards() over records[start:stop]."""
+        records = self.records[start:stop]
+        captures = records['captures'].astype(np.int64)
+        return agent.evaluate_boards(records['board'], captures[:, 0] - captures[:, 1])
@@ -0,0 +1,88 @@
+CHAIN_LIMIT = 32
+BLOOM_MASK = 1023
+
+
+class SuperkoHistory:
+    """
+    Persistent set of Zobrist keys used for the positional-superko history.
+
+    A history is a short parent-linked chain of recent keys on top of a shared
+    frozenset `base`. add() returns a new history in O(1) and never touches the
+    old one, so a state and all of its successors share their common past
+    instead of copying it. Once the chain reaches CHAIN_LIMIT keys the next
+    add() starts a fresh chain on a new base; that base is built once per
+    parent and reused by all of its children.
+
+    Lookups check the base, then a 1024-bit bloom mask of the chain, and only
+    walk the chain (at most CHAIN_LIMIT nodes) when the mask matches, so the
+    cost does not grow with the length of the game.
+
+    The price is paid at chain boundaries: building the new base copies the
+    whole history, O(len(history)), once every CHAIN_LIMIT plies along a
+    line of play (so O(len / CHAIN_LIMIT) per ply amortized), and search
+    nodes whose parent sits on a boundary share that one copy. This is
+    accepted in exchange for single-set lookups; linking the new base to
+    the old one instead would make every lookup check one set per segment.
+    """
+    __slots__ = ('base', 'key', 'parent', 'length', 'bloom', '_size', '_frozen')
+
+    def __init__(self, keys=()):
+        self.base = frozenset(keys)
+        self.key = None
+        self.parent = None
+        self.length = 0
+        self.bloom = 0
+        self._size = len(self.base)
+        self._frozen = self.base
+
+    def add(self, key):
+        if key in self:
+            return self
+        node = SuperkoHistory.__new__(SuperkoHistory)
+        if self.length >= CHAIN_LIMIT:
+            node.base = self.frozen()
+            node.parent = None
+            node.length = 1
+            node.bloom = 1 << (key & BLOOM_MASK)
+        else:
+            node.base = self.base
+            node.parent = self
+            node.length = self.length + 1
+            node.bloom = self.bloom | (1 << (key & BLOOM_MASK))
+        node.key = key
+        node._size = self._size + 1
+        node._frozen = None
+        return node
+
+    def frozen(self):
+        """Returns every key in the history as a frozenset (memoized)."""
+        if self._frozen is None:
+            self._frozen = self.base.union(self._chain())
+        return self._frozen
+
+    def _chain(self):
+        node = self
+        while node is not None and node.key is not None:
+            yield node.key
+            node = node.parent
+
+    def __contains__(self, key):
+        if key in self.base:
+            return True
+        if not (self.bloom >> (key & BLOOM_MASK)) & 1:
+            return False
+        node = self
+        while node is not None and node.key is not None:
+            if node.key == key:
+                return True
+            node = node.parent
+        return False
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        return iter(self.frozen())
+
+    def __repr__(self):
+        return f"<SuperkoHistory size={self._size} chain={self.length}>"
@@ -0,0 +1,45 @@
+"""
+Background search jobs, so a UI loop never waits on get_best_move().
+"""
+import threading
+
+
+class SearchJob:
+    """
+    Runs one search for `state` in a daemon thread.
+
+    `search` defaults to agent.get_best_move (pass e.g. a Ponderer's
+    get_best_move instead). Poll `done` each frame, then read `move`;
+    progress() forwards the agent's live progress report. cancel() stops the
+    search through the agent's stop_event and waits for the thread, which
+    takes one node-count check (128 nodes) or one playout.
+    """
+    def __init__(self, agent, state, search=None):
+        self.agent = agent
+        if agent.stop_event is None:
+            agent.stop_event = threading.Event()
+        self.search = search or agent.get_best_move
+        self.move = None
+        self.done = False
+        self.cancelled = False
+        self.thread = threading.Thread(target=self._run, args=(state.copy(),), daemon=True)
+        self.thread.start()
+
+    def _run(self, state):
+        try:
+            self.move = self.search(state)
+        finally:
+            self.done = True
+
+    def progress(self):
+        return self.agent.progress()
+
+    def cancel(self):
+        """Stops the search and discards its result."""
+        self.cancelled = True
+        stop = self.agent.stop_event
+        # A Ponderer clears the event between its searches, so keep setting it
+        while self.thread.is_alive():
+            stop.set()
+            self.thread.join(0.01)
+        stop.clear()
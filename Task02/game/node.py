@@ -8,5 +8,11 @@ class Node:
         if parent:
             self.depth = parent.depth + 1
 
+        # Tree-search statistics (used by MCTSAgent)
+        self.children = []
+        self.untried_actions = None
+        self.visits = 0
+        self.wins = 0.0
+
     def __repr__(self):
         return f"<Node action={self.action} depth={self.depth}>"
@@ -0,0 +1,75 @@
+from .state import EMPTY
+
+CAPTURE_SCORE = 1 << 30
+ESCAPE_SCORE = 1 << 29
+KILLER_SCORE = 1 << 28
+
+
+class MoveOrderer:
+    """
+    Move ordering for alpha-beta search (pass one to MinimaxAgent(ordering=...)).
+
+    Moves are tried in this order:
+    1. The transposition table's best move
+    2. Captures (bigger captures first), then atari escapes
+    3. Killer moves: the last `killers_per_ply` moves that caused a beta
+       cutoff at the same ply
+    4. History heuristic: moves that caused cutoffs anywhere in the tree,
+       weighted by depth^2
+    5. Everything else in raster order
+    """
+    def __init__(self, killers_per_ply=2):
+        self.killers_per_ply = killers_per_ply
+        self.killers = {}
+        self.history = {}
+
+    def settings(self):
+        """Constructor arguments for an equivalent orderer (without the tables)."""
+        return {'killers_per_ply': self.killers_per_ply}
+
+    def new_search(self):
+        """Called at the start of each get_best_move(): drop killers, age history."""
+        self.killers = {}
+        self.history = {k: v >> 1 for k, v in self.history.items() if v > 1}
+
+    def order(self, state, moves, ply, tt_move=None):
+        cells, gid, libs, stones = state._cells, state._gid, state._libs, state._stones
+        neighbors, size = state._neighbors, state.size
+        color = state.current_player
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def score(move):
+            if move == tt_move:
+                return CAPTURE_SCORE << 1
+            p = move[0] * size + move[1]
+            bit = 1 << p
+            captured = 0
+            escape = False
+            for q in neighbors[p]:
+                v = cells[q]
+                if v == EMPTY: continue
+                g = gid[q]
+                if libs[g] == bit:
+                    if v == color:
+                        escape = True
+                    else:
+                        captured += stones[g].bit_count()
+            if captured:
+                return CAPTURE_SCORE + captured
+            if escape:
+                return ESCAPE_SCORE
+            if move in killers:
+                return KILLER_SCORE
+            return history.get((color, move), 0)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def cutoff(self, state, move, ply, depth):
+        """Records `move` as having caused a beta cutoff for the side to move in `state`."""
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.killers_per_ply:]
+        key = (state.current_player, move)
+        self.history[key] = self.history.get(key, 0) + depth * depth
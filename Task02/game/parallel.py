@@ -0,0 +1,72 @@
+"""
+Worker side of MinimaxAgent's root-parallel search (workers > 1).
+
+Each task searches one root move. Workers share the root alpha through a
+multiprocessing.Value handed to every process when the pool starts, so a
+good score found by one worker tightens the window for all the others.
+Positions travel as GoState.to_compact() tuples and are decoded once per
+search in each worker; worker agents (and their transposition tables) are
+kept for the lifetime of the pool and rebuilt when the agent's
+worker_kwargs() change.
+"""
+import math
+import time
+
+from .agent import SearchTimeout
+from .problem import GoProblem
+from .state import GoState
+
+_shared_alpha = None
+_agents = {}
+_position = (None, None)
+
+
+def init_worker(shared_alpha):
+    global _shared_alpha
+    _shared_alpha = shared_alpha
+
+
+def _build_kwargs(agent_kwargs):
+    kwargs = dict(agent_kwargs)
+    if kwargs.get('ordering') is not None:
+        ordering_cls, settings = kwargs['ordering']
+        kwargs['ordering'] = ordering_cls(**settings)
+    return kwargs
+
+
+def search_root_move(agent_key, agent_cls, agent_kwargs, search_id, compact, move, depth, deadline):
+    """Returns (value, alpha used, move, nodes), or None if the deadline (wall
+    clock, time.time()) passed first."""
+    global _position
+    kwargs, agent = _agents.get(agent_key, (None, None))
+    if agent is None or kwargs != agent_kwargs:
+        agent = agent_cls(GoProblem(), **_build_kwargs(agent_kwargs))
+        _agents[agent_key] = (agent_kwargs, agent)
+        _position = (None, None)
+    if _position[0] != search_id:
+        _position = (search_id, GoState.from_compact(compact))
+        if agent.ordering is not None:
+            agent.ordering.new_search()
+        if agent.tt is not None:
+            agent.tt.new_generation()
+    state = _position[1]
+
+    agent.nodes = 0
+    agent.deadline = None if deadline is None else time.perf_counter() + (deadline - time.time())
+    agent.root_depth = depth
+    alpha = _shared_alpha.value
+    mark = len(state._undo)
+    try:
+        agent.problem.play(state, move)
+        val = agent.min_value(state, depth - 1, alpha, math.inf)
+    except SearchTimeout:
+        return None
+    finally:
+        while len(state._undo) > mark:
+            agent.problem.undo(state)
+        agent.deadline = None
+
+    with _shared_alpha.get_lock():
+        if val > _shared_alpha.value:
+            _shared_alpha.value = val
+    return val, alpha, move, agent.nodes
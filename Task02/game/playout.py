@@ -0,0 +1,225 @@
+from .state import EMPTY, BLACK, WHITE, KOMI
+
+BORDER = 3
+
+
+class PlayoutBoard:
+    """
+    Minimal board for Monte Carlo playouts.
+
+    Points live on a padded (size+2)^2 list so neighbours are p±1 and p±width
+    with no bounds checks. Groups are circular linked lists of stones
+    (`nxt`) with a root per stone and a pseudo-liberty count per root (empty
+    neighbours counted once per adjacent stone): a group is captured when the
+    count reaches zero, so no flood fill is ever needed. There is no superko
+    history, only simple ko, and games are scored by area (stones plus empty
+    points bordered by one colour) with komi. That is all a random playout
+    needs and makes each move far cheaper than GoProblem.result().
+    """
+    __slots__ = ('size', 'width', 'cells', 'root', 'nxt', 'libs', 'count',
+                 'empties', 'where', 'ko', 'to_play', 'passes')
+
+    def __init__(self, size):
+        self.size = size
+        self.width = w = size + 2
+        n = w * w
+        self.cells = [BORDER] * n
+        self.root = [-1] * n
+        self.nxt = [0] * n
+        self.libs = [0] * n
+        self.count = [0] * n
+        self.empties = []
+        self.where = {}
+        for r in range(size):
+            for c in range(size):
+                p = (r + 1) * w + c + 1
+                self.cells[p] = EMPTY
+                self.where[p] = len(self.empties)
+                self.empties.append(p)
+        self.ko = -1
+        self.to_play = BLACK
+        self.passes = 0
+
+    @classmethod
+    def from_state(cls, state):
+        board = cls(state.size)
+        size, w = state.size, board.width
+        for p, v in enumerate(state._cells):
+            if v:
+                r, c = divmod(p, size)
+                board._place((r + 1) * w + c + 1, v)
+        if state.ko_point is not None:
+            r, c = divmod(state.ko_point, size)
+            board.ko = (r + 1) * w + c + 1
+        board.to_play = state.current_player
+        board.passes = 1 if state.last_move_was_pass else 0
+        return board
+
+    def _place(self, p, color):
+        """Puts a stone on p and merges it with friendly neighbours. Returns the
+        number of opponent stones captured and the last captured point."""
+        cells, root, nxt, libs, count, w = self.cells, self.root, self.nxt, self.libs, self.count, self.width
+        empties, where = self.empties, self.where
+        i = where.pop(p)
+        last = empties.pop()
+        if last != p:
+            empties[i] = last
+            where[last] = i
+
+        cells[p] = color
+        root[p] = p
+        nxt[p] = p
+        count[p] = 1
+        own = 0
+        for n in (p - 1, p + 1, p - w, p + w):
+            v = cells[n]
+            if v == EMPTY:
+                own += 1
+            elif v != BORDER:
+                libs[root[n]] -= 1
+        libs[p] = own
+
+        for n in (p - 1, p + 1, p - w, p + w):
+            if cells[n] == color:
+                a, b = root[p], root[n]
+                if a == b: continue
+                if count[a] < count[b]:
+                    a, b = b, a
+                q = b
+                while True:
+                    root[q] = a
+                    q = nxt[q]
+                    if q == b: break
+                nxt[a], nxt[b] = nxt[b], nxt[a]
+                libs[a] += libs[b]
+                count[a] += count[b]
+
+        captured = 0
+        last_captured = -1
+        for n in (p - 1, p + 1, p - w, p + w):
+            if cells[n] != EMPTY and cells[n] != color and cells[n] != BORDER and libs[root[n]] == 0:
+                captured += self._remove_group(root[n])
+                last_captured = n
+        return captured, last_captured
+
+    def _remove_group(self, g):
+        cells, root, nxt, libs, w = self.cells, self.root, self.nxt, self.libs, self.width
+        empties, where = self.empties, self.where
+        stones = []
+        q = g
+        while True:
+            stones.append(q)
+            cells[q] = EMPTY
+            root[q] = -1
+            where[q] = len(empties)
+            empties.append(q)
+            q = nxt[q]
+            if q == g: break
+        for q in stones:
+            for n in (q - 1, q + 1, q - w, q + w):
+                r = root[n]
+                if r >= 0:
+                    libs[r] += 1
+        return len(stones)
+
+    def is_legal(self, p):
+        if p == self.ko or self.cells[p] != EMPTY:
+            return False
+        cells, root, libs, w = self.cells, self.root, self.libs, self.width
+        nbrs = (p - 1, p + 1, p - w, p + w)
+        for n in nbrs:
+            if cells[n] == EMPTY:
+                return True
+        color = self.to_play
+        for n in nbrs:
+            v = cells[n]
+            if v == BORDER: continue
+            r = root[n]
+            adjacent = 0
+            for m in nbrs:
+                if root[m] == r: adjacent += 1
+            if v == color:
+                if libs[r] > adjacent: return True
+            elif libs[r] == adjacent:
+                return True
+        return False
+
+    def is_eye(self, p, color):
+        """True if p is a single-point eye of `color` (filling it is never useful)."""
+        cells, w = self.cells, self.width
+        for n in (p - 1, p + 1, p - w, p + w):
+            v = cells[n]
+            if v != color and v != BORDER:
+                return False
+        bad = 0
+        edge = False
+        for n in (p - w - 1, p - w + 1, p + w - 1, p + w + 1):
+            v = cells[n]
+            if v == BORDER:
+                edge = True
+            elif v != color and v != EMPTY:
+                bad += 1
+        return bad == 0 if edge else bad < 2
+
+    def play(self, p):
+        """Plays a legal move for the side to move (None passes)."""
+        color = self.to_play
+        self.to_play = WHITE if color == BLACK else BLACK
+        self.ko = -1
+        if p is None:
+            self.passes += 1
+            return
+        self.passes = 0
+        captured, last_captured = self._place(p, color)
+        if captured == 1 and self.count[self.root[p]] == 1 and self.libs[self.root[p]] == 1:
+            # A lone stone that took one stone and is in atari on that point
+            self.ko = last_captured
+
+    def random_move(self, rng):
+        """A random legal move that does not fill an own eye, or None. The
+        empty points are scanned from a random start, so a point right after
+        a run of unplayable ones is picked more often than the rest; that is
+        the price of not building the candidate list every move."""
+        empties = self.empties
+        n = len(empties)
+        if not n:
+            return None
+        color = self.to_play
+        start = rng.randrange(n)
+        for i in range(n):
+            p = empties[(start + i) % n]
+            if not self.is_eye(p, color) and self.is_legal(p):
+                return p
+        return None
+
+    def playout(self, rng, max_moves=None):
+        """Plays random moves until two passes in a row. Returns the winner."""
+        if max_moves is None:
+            max_moves = 3 * self.size * self.size
+        for _ in range(max_moves):
+            if self.passes >= 2:
+                break
+            self.play(self.random_move(rng))
+        return BLACK if self.score() > 0 else WHITE
+
+    def score(self, komi=KOMI):
+        """Area score from Black's point of view: stones + one-colour empty points - komi."""
+        cells, w = self.cells, self.width
+        black = white = 0
+        for r in range(1, self.size + 1):
+            for p in range(r * w + 1, r * w + self.size + 1):
+                v = cells[p]
+                if v == BLACK:
+                    black += 1
+                elif v == WHITE:
+                    white += 1
+                else:
+                    owners = 0
+                    for n in (p - 1, p + 1, p - w, p + w):
+                        owners |= 1 << cells[n]
+                    owners &= ~((1 << BORDER) | (1 << EMPTY))
+                    if owners == 1 << BLACK:
+                        black += 1
+                    elif owners == 1 << WHITE:
+                        white += 1
+        return black - white - komi
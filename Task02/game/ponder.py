@@ -0,0 +1,117 @@
+"""
+Pondering: searching on the opponent's time.
+
+After the agent moves, Ponderer guesses the opponent's reply (the agent's
+expected_reply()) and searches the position after it in a daemon thread
+while the opponent thinks. When the real reply arrives:
+
+- hit (the predicted position was reached): the ponder search keeps going
+  until it has used the agent's normal time budget, counting the time it
+  already had, and its move is played
+- miss: the ponder search is stopped and a normal search is run. A
+  MinimaxAgent's transposition table still holds whatever overlaps; an
+  MCTSAgent's tree was re-rooted at the predicted position by the ponder
+  search, so it starts a new tree
+
+Works with any agent that has get_best_move(), expected_reply(), time_limit
+and stop_event (MinimaxAgent and MCTSAgent). A parallel MinimaxAgent only
+stops at its deadline, so its ponder searches are capped by `max_time`.
+"""
+import threading
+import time
+
+
+class Ponderer:
+    def __init__(self, agent, max_time=30.0):
+        self.agent = agent
+        self.max_time = max_time
+        self.stop_event = threading.Event()
+        agent.stop_event = self.stop_event
+        self.thread = None
+        self.predicted = None
+        self.started = 0.0
+        self.budget = None
+        self.result = None
+        self.hits = 0
+        self.misses = 0
+        self.last_was_hit = False
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def pondering(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, state):
+        """Starts pondering on `state`, the position right after the agent's move.
+        Returns the predicted reply, or None if there is nothing to ponder."""
+        self.stop()
+        agent = self.agent
+        if state.game_over:
+            return None
+        reply = agent.expected_reply(state)
+        if reply is None:
+            return None
+        self.predicted = agent.problem.result(state, reply)
+        self.result = None
+        self.budget = agent.time_limit
+        self.started = time.perf_counter()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, args=(self.predicted,), daemon=True)
+        self.thread.start()
+        return reply
+
+    def _run(self, state):
+        agent = self.agent
+        if self.budget is not None:
+            # Search until stopped instead of for the usual budget
+            agent.time_limit = self.max_time
+        try:
+            move = agent.get_best_move(state)
+            self.result = (move, agent.last_search)
+        except Exception:
+            # A failed ponder search is a hit without a result: the real
+            # position is searched again in get_best_move()
+            self.result = None
+        finally:
+            agent.time_limit = self.budget
+
+    def stop(self):
+        """Aborts the ponder search, if any, and waits for the thread to finish."""
+        self.predicted = None
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+        self.stop_event.clear()
+
+    def get_best_move(self, state):
+        """The agent's move in `state`: the ponder search's on a hit, else a fresh search."""
+        predicted = self.predicted
+        self.predicted = None
+        hit = (predicted is not None and predicted.hash == state.hash
+               and predicted.current_player == state.current_player
+               and predicted.captures == state.captures)
+        self.last_was_hit = hit
+        if predicted is None:
+            return self.agent.get_best_move(state)
+        if not hit:
+            self.misses += 1
+            self.stop()
+            return self.agent.get_best_move(state)
+
+        self.hits += 1
+        budget = self.budget
+        if budget is not None:
+            self.thread.join(max(0.0, budget - (time.perf_counter() - self.started)))
+            self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.stop_event.clear()
+        if self.result is None:
+            return self.agent.get_best_move(state)
+        move, self.agent.last_search = self.result
+        return move
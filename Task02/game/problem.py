@@ -1,5 +1,4 @@
-import copy
-from .state import GoState, BLACK, WHITE, EMPTY, BOARD_SIZE
+from .state import GoState, BLACK, WHITE, BOARD_SIZE, LEGAL
 
 class Problem:
     """The abstract class for a formal problem."""
@@ -27,60 +26,65 @@ class GoProblem(Problem):
     def actions(self, state):
         """Returns a list of legal moves (r, c)."""
         if state.game_over: return []
-        moves = []
-        for r in range(state.size):
-            for c in range(state.size):
-                if state.board[r][c] == EMPTY:
-                    if self.is_valid_move(state, r, c):
-                        moves.append((r, c))
-        return moves
+        return list(state.iter_legal_moves())
+
+    def iter_actions(self, state):
+        """Yields legal moves (r, c) lazily so callers can stop early."""
+        if state.game_over: return iter(())
+        return state.iter_legal_moves()
 
     def is_valid_move(self, state, r, c):
         if not (0 <= r < state.size and 0 <= c < state.size): return False
-        if state.board[r][c] != EMPTY: return False
-
-        # Simulate move on a temp board
-        temp_board = copy.deepcopy(state.board)
-        temp_board[r][c] = state.current_player
-        opponent = WHITE if state.current_player == BLACK else BLACK
-
-        # We need to use state's helper methods, but on the temp_board
-        captured = state.remove_dead_stones(temp_board, r, c, opponent)
-
-        # Check suicide rule
-        if not captured and state.count_liberties(temp_board, r, c) == 0:
-            return False
-
-        # Check Ko/Superko
-        new_hash = tuple(tuple(row) for row in temp_board)
-        if new_hash in state.history:
-            return False
-        return True
+        return state.classify_move(r, c) == LEGAL
 
     def result(self, state, action):
         """Return the state that results from executing the given action in the given state."""
         new_state = state.copy()
-        opponent = WHITE if state.current_player == BLACK else BLACK
+        self.play(new_state, action)
+        return new_state
+
+    def play(self, state, action):
+        """Executes the action on `state` in place. undo() takes it back."""
+        player = state.current_player
+        opponent = WHITE if player == BLACK else BLACK
+        mark = len(state._trail)
+        prev_hash, prev_ko = state.hash, state.ko_point
+        prev_pass, prev_over = state.last_move_was_pass, state.game_over
+        prev_history = state.history
 
         if action is None:
             # Pass move
-            if new_state.last_move_was_pass:
-                new_state.game_over = True
-            new_state.last_move_was_pass = True
-            new_state.current_player = opponent
-            return new_state
+            if state.last_move_was_pass:
+                state.game_over = True
+            state.last_move_was_pass = True
+            state.ko_point = None
+            state.current_player = opponent
+            state._undo.append((mark, None, 0, prev_hash, prev_ko, prev_pass, prev_over, prev_history))
+            return
 
         r, c = action
-        new_state.board[r][c] = state.current_player
-        new_state.last_move_was_pass = False
-
-        # Remove dead stones
-        captured = new_state.remove_dead_stones(new_state.board, r, c, opponent)
-        new_state.captures[state.current_player] += len(captured)
-
-        new_state.history.add(new_state.get_board_hash())
-        new_state.current_player = opponent
-        return new_state
+        state.last_move_was_pass = False
+
+        # Place the stone; the group records remove dead stones
+        captured = state.place_stone(r * state.size + c, player)
+        state.captures[player] += len(captured)
+
+        state.record_position()
+        state.current_player = opponent
+        state._undo.append((mark, action, len(captured), prev_hash, prev_ko, prev_pass, prev_over, prev_history))
+
+    def undo(self, state):
+        """Takes back the last move made with play()."""
+        mark, action, n_captured, prev_hash, prev_ko, prev_pass, prev_over, prev_history = state._undo.pop()
+        player = WHITE if state.current_player == BLACK else BLACK
+        state.rollback(mark)
+        state.captures[player] -= n_captured
+        state.hash = prev_hash
+        state.ko_point = prev_ko
+        state.last_move_was_pass = prev_pass
+        state.game_over = prev_over
+        state.history = prev_history
+        state.current_player = player
 
     def is_terminal(self, state):
         return state.game_over
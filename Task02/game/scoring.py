@@ -0,0 +1,141 @@
+from collections import OrderedDict
+
+from .state import EMPTY, BLACK, WHITE, KOMI, neighbor_table
+
+
+class ScoreKeeper:
+    """
+    Memoized, incremental GoState.calculate_score() for the scoring phase.
+
+    score(state, dead) returns the same dict as calculate_score(dead) (the
+    territory lists may be in a different order). Results are cached on
+    (position hash, captures, dead-stone set), so asking again for an
+    unchanged position costs one dict lookup.
+
+    The keeper also holds the empty regions of the last position it scored.
+    When only the dead-stone set changed (a group was toggled in scoring
+    mode), just the regions containing or touching the toggled stones are
+    flood-filled again; every other region keeps its owner.
+    """
+    def __init__(self, max_cached=64):
+        self.max_cached = max_cached
+        self.results = OrderedDict()
+        self.position = None
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+
+    def score(self, state, dead_stones_set=None):
+        dead = frozenset(dead_stones_set or ())
+        key = (state.hash, state.captures[BLACK], state.captures[WHITE], dead)
+        result = self.results.get(key)
+        if result is not None:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return result
+        self.misses += 1
+
+        size = state.size
+        if self.position != key[:3] or self.size != size:
+            self.rebuild(state, dead)
+        else:
+            changed = [r * size + c for r, c in dead ^ self.dead]
+            for p in changed:
+                self.cells[p] = EMPTY if (divmod(p, size) in dead) else self.stones[p]
+            self.dead = dead
+            self.relabel(changed)
+
+        result = self.result(state)
+        self.results[key] = result
+        if len(self.results) > self.max_cached:
+            self.results.popitem(last=False)
+        return result
+
+    def rebuild(self, state, dead):
+        size = state.size
+        self.size = size
+        self.neighbors = neighbor_table(size)
+        self.position = (state.hash, state.captures[BLACK], state.captures[WHITE])
+        self.stones = bytes(state._cells)
+        self.cells = bytearray(self.stones)
+        for r, c in dead:
+            self.cells[r * size + c] = EMPTY
+        self.dead = dead
+        self.region = [None] * (size * size)
+        self.regions = {}
+        self.next_region = 0
+        self.territory = {BLACK: 0, WHITE: 0}
+        self.relabel(range(size * size))
+
+    def relabel(self, points):
+        """Flood-fills again the empty regions that contain or touch `points`."""
+        cells, neighbors, region = self.cells, self.neighbors, self.region
+        stale = set()
+        for p in points:
+            if region[p] is not None:
+                stale.add(region[p])
+            for q in neighbors[p]:
+                if region[q] is not None:
+                    stale.add(region[q])
+        seeds = set(points)
+        for rid in stale:
+            pts, owners = self.regions.pop(rid)
+            self.count(pts, owners, -1)
+            for p in pts:
+                region[p] = None
+            seeds.update(pts)
+
+        for start in seeds:
+            if cells[start] != EMPTY or region[start] is not None:
+                continue
+            rid = self.next_region
+            self.next_region += 1
+            region[start] = rid
+            stack = [start]
+            pts = []
+            owners = set()
+            while stack:
+                p = stack.pop()
+                pts.append(p)
+                for q in neighbors[p]:
+                    v = cells[q]
+                    if v == EMPTY:
+                        if region[q] is None:
+                            region[q] = rid
+                            stack.append(q)
+                    else:
+                        owners.add(v)
+            self.regions[rid] = (pts, owners)
+            self.count(pts, owners, 1)
+
+    def count(self, pts, owners, sign):
+        if len(owners) == 1:
+            for owner in owners:
+                self.territory[owner] += sign * len(pts)
+
+    def result(self, state):
+        size = self.size
+        black_territory_pts = []
+        white_territory_pts = []
+        for pts, owners in self.regions.values():
+            if len(owners) == 1:
+                target = black_territory_pts if BLACK in owners else white_territory_pts
+                target.extend(divmod(p, size) for p in pts)
+
+        extra_black_captures = extra_white_captures = 0
+        for r, c in self.dead:
+            v = self.stones[r * size + c]
+            if v == BLACK:
+                extra_white_captures += 1
+            elif v == WHITE:
+                extra_black_captures += 1
+
+        final_black = state.captures[BLACK] + extra_black_captures + self.territory[BLACK]
+        final_white = state.captures[WHITE] + extra_white_captures + self.territory[WHITE] + KOMI
+        return {
+            BLACK: final_black,
+            WHITE: final_white,
+            'winner': BLACK if final_black > final_white else WHITE,
+            'black_territory': black_territory_pts,
+            'white_territory': white_territory_pts,
+        }
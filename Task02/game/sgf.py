@@ -0,0 +1,228 @@
+"""
+SGF (FF[4]) game records: writing move sequences, reading games, streaming
+games out of large multi-game collections and replaying them into GoState.
+
+Only what a game record needs is understood: board size (SZ), komi (KM),
+result (RE), player names, setup stones (AB/AW), side to play (PL) and B/W
+moves; other properties are kept as strings in SgfGame.properties. Where a
+record has variations, the main line (first variation at every branch) is
+read. Points are written column letter first ('a' = 0), and a pass is an
+empty value (B[]), with B[tt] also read as a pass on boards up to 19x19.
+"""
+import re
+
+from .state import GoState, BLACK, WHITE, BOARD_SIZE, KOMI
+from .problem import GoProblem
+
+COLORS = {'B': BLACK, 'W': WHITE}
+LETTERS = {BLACK: 'B', WHITE: 'W'}
+
+_TOKEN = re.compile(r'\s*(?:([();])|([A-Za-z]+)((?:\s*\[(?:[^\]\\]|\\.)*\])+))', re.S)
+_VALUE = re.compile(r'\[((?:[^\]\\]|\\.)*)\]', re.S)
+_SPECIAL = re.compile(r'[()\[\]\\]')
+
+
+class SgfGame:
+    """One game record: root properties, setup stones and the move list.
+    `moves` holds (color, (r, c) or None) pairs in game order."""
+    def __init__(self, size=BOARD_SIZE, komi=KOMI, moves=None, setup=None, properties=None):
+        self.size = size
+        self.komi = komi
+        self.moves = moves if moves is not None else []
+        self.setup = setup if setup is not None else {BLACK: [], WHITE: []}
+        self.properties = properties if properties is not None else {}
+        self.first_player = BLACK
+
+    @property
+    def result(self):
+        return self.properties.get('RE')
+
+    def __repr__(self):
+        return f"<SgfGame size={self.size} moves={len(self.moves)} result={self.result}>"
+
+
+def _point(value, size):
+    if value == '' or (value == 'tt' and size <= 19):
+        return None
+    return ord(value[1]) - ord('a'), ord(value[0]) - ord('a')
+
+
+def _escape(text):
+    return str(text).replace('\\', '\\\\').replace(']', '\\]')
+
+
+def _unescape(text):
+    # Escaped characters stand for themselves; an escaped newline is removed
+    return re.sub(r'\\(\n|\r\n?)|\\(.)', lambda m: m.group(2) or '', text, flags=re.S)
+
+
+def loads(text):
+    """Parses the first game of an SGF string."""
+    pos = 0
+    nodes = []
+    depth = 0
+    for match in _TOKEN.finditer(text):
+        if match.start() != pos and text[pos:match.start()].strip():
+            raise ValueError(f"SGF syntax error at offset {pos}")
+        pos = match.end()
+        punct, ident, values = match.groups()
+        if punct == '(':
+            depth += 1
+        elif punct == ')':
+            # The first closing parenthesis ends the main line
+            break
+        elif punct == ';':
+            nodes.append([])
+        elif nodes:
+            nodes[-1].append((ident.upper(), [_unescape(v) for v in _VALUE.findall(values)]))
+    if not nodes:
+        raise ValueError("no SGF game found")
+
+    root = dict(nodes[0])
+    size = int(root.get('SZ', [BOARD_SIZE])[0].split(':')[0])
+    komi = float(root['KM'][0]) if root.get('KM', [''])[0] else KOMI
+    game = SgfGame(size, komi, properties={k: v[0] if len(v) == 1 else v for k, v in root.items()})
+    for node in nodes:
+        for ident, values in node:
+            if ident in ('AB', 'AW'):
+                for value in values:
+                    if value:
+                        game.setup[COLORS[ident[1]]].append(_point(value, size))
+            elif ident == 'PL' and not game.moves:
+                game.first_player = COLORS[values[0].upper()]
+            elif ident in COLORS:
+                game.moves.append((COLORS[ident], _point(values[0], size)))
+    return game
+
+
+def load(source):
+    """Reads the first game from a path or an open text file."""
+    return next(iter_games(source))
+
+
+def iter_games(source, chunk_size=1 << 16):
+    """
+    Yields the games of a (possibly huge) SGF collection one at a time. The
+    file is read in chunks and each game is parsed as soon as its closing
+    parenthesis arrives, so only one game is held in memory at once.
+    `source` is a path or an open text file.
+    """
+    if isinstance(source, str):
+        with open(source, encoding='utf-8', errors='replace') as f:
+            yield from iter_games(f, chunk_size)
+        return
+
+    parts = []
+    depth = 0
+    in_value = False
+    escape_at = -1
+    offset = 0
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        start = 0
+        for match in _SPECIAL.finditer(chunk):
+            ch = match.group()
+            i = match.start()
+            if in_value:
+                # Inside [...] only an unescaped ']' matters
+                if offset + i == escape_at:
+                    continue
+                if ch == '\\':
+                    escape_at = offset + i + 1
+                elif ch == ']':
+                    in_value = False
+            elif ch == '[':
+                in_value = True
+            elif ch == '(':
+                if depth == 0:
+                    start = i
+                    parts = []
+                depth += 1
+            elif ch == ')' and depth:
+                depth -= 1
+                if depth == 0:
+                    parts.append(chunk[start:i + 1])
+                    yield loads(''.join(parts))
+                    parts = []
+        if depth:
+            parts.append(chunk[start:])
+        offset += len(chunk)
+    if depth:
+        raise ValueError("unterminated SGF game at end of input")
+
+
+def dumps(moves, size=BOARD_SIZE, komi=KOMI, result=None, first_player=BLACK, **properties):
+    """
+    SGF text for a game. `moves` is a list of (r, c) / None in game order,
+    played alternately starting with `first_player`. Extra root properties
+    are passed as keywords (PB='...', ...).
+    """
+    root = f"(;GM[1]FF[4]CA[UTF-8]SZ[{size}]KM[{komi:g}]"
+    if result:
+        root += f"RE[{_escape(result)}]"
+    if first_player != BLACK:
+        root += "PL[W]"
+    for ident, value in properties.items():
+        root += f"{ident}[{_escape(value)}]"
+    out = [root]
+    color = first_player
+    for move in moves:
+        coord = '' if move is None else chr(ord('a') + move[1]) + chr(ord('a') + move[0])
+        out.append(f";{LETTERS[color]}[{coord}]")
+        color = WHITE if color == BLACK else BLACK
+    out.append(")\n")
+    return ''.join(out)
+
+
+def dump(path, moves, **kwargs):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(dumps(moves, **kwargs))
+
+
+def initial_state(game):
+    """The game's starting position (setup stones placed)."""
+    if not (game.setup[BLACK] or game.setup[WHITE]):
+        state = GoState(game.size)
+        state.current_player = game.first_player
+        return state
+    cells = [0] * (game.size * game.size)
+    for color in (BLACK, WHITE):
+        for r, c in game.setup[color]:
+            cells[r * game.size + c] = color
+    return GoState.from_cells(game.size, cells, game.first_player)
+
+
+def replay(game, problem=None, positions=False):
+    """
+    Plays the game's moves from its initial state in place with
+    GoProblem.play(). Returns the final GoState, or with positions=True
+    yields a copy of the position before every move and the final one.
+    Moves are not checked for legality.
+    """
+    if positions:
+        return _replay_positions(game, problem or GoProblem())
+    problem = problem or GoProblem()
+    state = initial_state(game)
+    for color, move in game.moves:
+        state.current_player = color
+        problem.play(state, move)
+    state.clear_undo()
+    return state
+
+
+def _replay_positions(game, problem):
+    state = initial_state(game)
+    for color, move in game.moves:
+        state.current_player = color
+        yield state.copy()
+        problem.play(state, move)
+    yield state.copy()
+
+
+def replay_all(games, problem=None):
+    """Final positions of many games (e.g. iter_games(path)), lazily."""
+    problem = problem or GoProblem()
+    for game in games:
+        yield replay(game, problem)
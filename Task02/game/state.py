@@ -1,4 +1,8 @@
-import copy
+import random
+import struct
+from array import array
+
+from .history import SuperkoHistory
 
 # Constants
 EMPTY = 0
@@ -7,30 +11,483 @@ WHITE = 2
 BOARD_SIZE = 9
 KOMI = 6.5
 
+# Move classes reported by GoState.classify_move()
+LEGAL = 0
+OCCUPIED = 1
+SUICIDE = 2
+KO = 3
+
+ZOBRIST_SEED = 0x60B0A7D
+
+# GoState.to_bytes() header: size, player, flags (1 = last move passed,
+# 2 = game over), ko point (-1 = none), black/white captures, Zobrist key
+PACKED_HEADER = struct.Struct('<BBBhHHQ')
+
+# Per-size table of neighbour indices on the flat board (up, down, left, right)
+_NEIGHBORS = {}
+
+
+def neighbor_table(size):
+    table = _NEIGHBORS.get(size)
+    if table is None:
+        table = []
+        for p in range(size * size):
+            r, c = divmod(p, size)
+            n = []
+            if r > 0: n.append(p - size)
+            if r < size - 1: n.append(p + size)
+            if c > 0: n.append(p - 1)
+            if c < size - 1: n.append(p + 1)
+            table.append(tuple(n))
+        table = tuple(table)
+        _NEIGHBORS[size] = table
+    return table
+
+
+_ZOBRIST = {}
+
+
+def zobrist_table(size):
+    """Returns (None, black_keys, white_keys): one 64-bit key per point and colour."""
+    table = _ZOBRIST.get(size)
+    if table is None:
+        rng = random.Random(ZOBRIST_SEED ^ size)
+        n = size * size
+        table = (None,
+                 tuple(rng.getrandbits(64) for _ in range(n)),
+                 tuple(rng.getrandbits(64) for _ in range(n)))
+        _ZOBRIST[size] = table
+    return table
+
+
+def iter_bits(mask):
+    """Yields the point index of every set bit in a bitboard."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 class GoState:
+    """
+    Go position stored on a flat board of size*size points (p = r*size + c).
+
+    Groups are kept as records keyed by their root point: `_gid[p]` is the root
+    of the group occupying p (-1 when empty), and `_stones[root]` /
+    `_libs[root]` are integer bitboards of the group's stones and liberties.
+    Records are merged (union by size) when a stone joins groups and updated in
+    place on captures, so liberty queries are O(1) and copy() only duplicates
+    a few flat arrays.
+
+    `hash` is the 64-bit Zobrist key of the stones on the board, updated by XOR
+    on every placement and capture (`_ghash[root]` holds the XOR of a group's
+    stone keys). The superko history is a persistent SuperkoHistory of these
+    keys, shared with every state derived from this one. Set
+    `GoState.verify_hashes = True` to keep a board snapshot per key and check
+    every superko hit against it; mismatches are counted in
+    `GoState.hash_collisions` and the move is allowed. Keys without a
+    snapshot are trusted.
+
+    Searches can mutate a state in place through GoProblem.play()/undo(): all
+    record writes go through an undo trail and each played move pushes an entry
+    on `_undo`, so no copying is needed per visited node.
+
+    `board` is a read-only list-of-rows view for the UI and legacy helpers.
+    """
+    verify_hashes = False
+    hash_collisions = 0
+
     def __init__(self, size=BOARD_SIZE):
         self.size = size
-        self.board = [[EMPTY for _ in range(size)] for _ in range(size)]
+        n = size * size
+        self._neighbors = neighbor_table(size)
+        self._cells = array('b', [EMPTY]) * n
+        self._gid = array('h', [-1]) * n
+        self._stones = [0] * n
+        self._libs = [0] * n
+        self._ghash = [0] * n
+        self._zobrist = zobrist_table(size)
+        self._view = None
+        self._trail = []
+        self._undo = []
+        self.hash = 0
+        self.ko_point = None
         self.current_player = BLACK
         self.captures = {BLACK: 0, WHITE: 0}
+        # Stones on the board and, per colour, the sum over stones of their
+        # group's liberty count (kept incrementally for the heuristic)
+        self.stone_counts = {BLACK: 0, WHITE: 0}
+        self.liberty_sums = {BLACK: 0, WHITE: 0}
 
         # Superko History
-        self.history = set()
-        self.history.add(self.get_board_hash())
+        self.history = SuperkoHistory()
+        self._positions = {}
+        self.record_position()
 
         self.last_move_was_pass = False
         self.game_over = False
 
+    @property
+    def board(self):
+        view = self._view
+        if view is None:
+            cells, size = self._cells, self.size
+            view = tuple(tuple(cells[i:i + size]) for i in range(0, size * size, size))
+            self._view = view
+        return view
+
     def get_board_hash(self):
-        return tuple(tuple(row) for row in self.board)
+        return self.hash
+
+    def record_position(self):
+        """Adds the current position to the superko history."""
+        self.history = self.history.add(self.hash)
+        if self.verify_hashes:
+            self._positions[self.hash] = self.board
+
+    def repeats_position(self, key, p, color, captured_roots):
+        """Positional-superko check for the position with Zobrist key `key`,
+        reached by a `color` stone on p capturing `captured_roots`."""
+        if key not in self.history:
+            return False
+        if not self.verify_hashes:
+            return True
+        cells = self._cells[:]
+        cells[p] = color
+        for g in captured_roots:
+            for q in iter_bits(self._stones[g]):
+                cells[q] = EMPTY
+        size = self.size
+        board = tuple(tuple(cells[i:i + size]) for i in range(0, size * size, size))
+        snapshot = self._positions.get(key)
+        # Keys recorded without a snapshot (rebuilt states, or before the flag
+        # was set) cannot be verified, so the hash result stands
+        if snapshot is not None and snapshot != board:
+            GoState.hash_collisions += 1
+            return False
+        return True
 
     def copy(self):
-        return copy.deepcopy(self)
+        cls = self.__class__
+        new = cls.__new__(cls)
+        new.__dict__.update(self.__dict__)
+        new._cells = self._cells[:]
+        new._gid = self._gid[:]
+        new._stones = self._stones[:]
+        new._libs = self._libs[:]
+        new._ghash = self._ghash[:]
+        new._trail = []
+        new._undo = []
+        new.captures = dict(self.captures)
+        new.stone_counts = dict(self.stone_counts)
+        new.liberty_sums = dict(self.liberty_sums)
+        if self.verify_hashes:
+            new._positions = dict(self._positions)
+        return new
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def clear_undo(self):
+        """Forgets the moves played in place so far; they can no longer be undone."""
+        self._undo.clear()
+        self._trail.clear()
+
+    def to_compact(self):
+        """Small picklable snapshot for sending a position to another process:
+        (size, cells, player, black captures, white captures, passed, game over,
+        ko point, superko keys)."""
+        return (self.size, self._cells.tobytes(), self.current_player,
+                self.captures[BLACK], self.captures[WHITE],
+                self.last_move_was_pass, self.game_over, self.ko_point, tuple(self.history))
+
+    @classmethod
+    def from_cells(cls, size, cells, player=BLACK, captures=(0, 0), passed=False, over=False, ko=None,
+                   keys=None):
+        """
+        Builds a state (group records included) from flat cell values and the
+        rest of a position: side to move, (black, white) captures, whether the
+        last move passed, game over, ko point and the superko history keys
+        (default: the position itself only).
+        """
+        state = cls(size)
+        for p, v in enumerate(cells):
+            if v: state.place_stone(p, v)
+        state._trail.clear()
+        state.current_player = player
+        state.captures = {BLACK: captures[0], WHITE: captures[1]}
+        state.last_move_was_pass = passed
+        state.game_over = over
+        state.ko_point = ko
+        state.history = SuperkoHistory((state.hash,) if keys is None else keys)
+        if state.verify_hashes:
+            state._positions = {state.hash: state.board}
+        return state
+
+    @classmethod
+    def from_compact(cls, data):
+        """Rebuilds a state (group records included) from to_compact() output."""
+        size, cells, player, black_captures, white_captures, passed, over, ko, keys = data
+        return cls.from_cells(size, cells, player, (black_captures, white_captures), passed, over, ko, keys)
+
+    def to_bytes(self):
+        """Fixed-width binary encoding: PACKED_HEADER followed by the board at
+        2 bits per point, four points per byte (38 bytes on 9x9). The superko
+        history is not stored."""
+        packed = bytearray((len(self._cells) + 3) >> 2)
+        for p, v in enumerate(self._cells):
+            if v: packed[p >> 2] |= v << ((p & 3) << 1)
+        flags = self.last_move_was_pass | (self.game_over << 1)
+        ko = -1 if self.ko_point is None else self.ko_point
+        return PACKED_HEADER.pack(self.size, self.current_player, flags, ko,
+                                  self.captures[BLACK], self.captures[WHITE], self.hash) + packed
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuilds a state from to_bytes() output. Its superko history holds
+        only the current position."""
+        size, player, flags, ko, black_captures, white_captures, key = PACKED_HEADER.unpack_from(data)
+        packed = data[PACKED_HEADER.size:]
+        cells = [(packed[p >> 2] >> ((p & 3) << 1)) & 3 for p in range(size * size)]
+        state = cls.from_cells(size, cells, player, (black_captures, white_captures), bool(flags & 1),
+                               bool(flags & 2), None if ko < 0 else ko)
+        if state.hash != key:
+            raise ValueError("Zobrist key does not match the encoded board")
+        return state
+
+    # --- Incremental group records ---
+
+    def place_stone(self, p, color):
+        """Puts a stone of `color` on empty point p, merging and capturing groups.
+        Returns the list of captured points.
+
+        Every array write is logged on `_trail` as (array, index, old value) so
+        that rollback() can restore the records exactly."""
+        cells, gid, stones, libs, ghash = self._cells, self._gid, self._stones, self._libs, self._ghash
+        log = self._trail.append
+        bit = 1 << p
+        key = self._zobrist[color][p]
+        log((cells, p, EMPTY))
+        log((gid, p, -1))
+        cells[p] = color
+        gid[p] = p
+        stones[p] = bit
+        ghash[p] = key
+        self.hash ^= key
+        own_libs = 0
+        friends = []
+        enemies = []
+        for q in self._neighbors[p]:
+            v = cells[q]
+            if v == EMPTY:
+                own_libs |= 1 << q
+            elif v == color:
+                g = gid[q]
+                if g not in friends: friends.append(g)
+            else:
+                g = gid[q]
+                if g not in enemies: enemies.append(g)
+        libs[p] = own_libs
+        log((stones, p, 0))
+        log((libs, p, 0))
+        log((ghash, p, 0))
+
+        # Evaluation counters: take out the touched groups' size * liberties
+        opponent = BLACK if color == WHITE else WHITE
+        counts, lib_sums = self.stone_counts, self.liberty_sums
+        log((counts, BLACK, counts[BLACK]))
+        log((counts, WHITE, counts[WHITE]))
+        log((lib_sums, BLACK, lib_sums[BLACK]))
+        log((lib_sums, WHITE, lib_sums[WHITE]))
+        for g in friends:
+            lib_sums[color] -= stones[g].bit_count() * libs[g].bit_count()
+        for e in enemies:
+            lib_sums[opponent] -= stones[e].bit_count() * libs[e].bit_count()
+
+        root = p
+        for g in friends:
+            root = self._merge(root, g)
+        log((libs, root, libs[root]))
+        libs[root] &= ~bit
+        counts[color] += 1
+        lib_sums[color] += stones[root].bit_count() * libs[root].bit_count()
+
+        captured = []
+        for e in enemies:
+            log((libs, e, libs[e]))
+            libs[e] &= ~bit
+            if libs[e]:
+                lib_sums[opponent] += stones[e].bit_count() * libs[e].bit_count()
+            else:
+                counts[opponent] -= stones[e].bit_count()
+                captured.extend(self._remove_group(e))
+
+        # Simple ko: a lone stone that captured one stone and sits in atari on it
+        self.ko_point = None
+        if len(captured) == 1 and stones[root] == bit and libs[root] == 1 << captured[0]:
+            self.ko_point = captured[0]
+        self._view = None
+        return captured
+
+    def _merge(self, a, b):
+        stones, libs, gid, ghash = self._stones, self._libs, self._gid, self._ghash
+        log = self._trail.append
+        if stones[a].bit_count() < stones[b].bit_count():
+            a, b = b, a
+        for q in iter_bits(stones[b]):
+            log((gid, q, b))
+            gid[q] = a
+        log((stones, a, stones[a]))
+        log((libs, a, libs[a]))
+        log((ghash, a, ghash[a]))
+        log((stones, b, stones[b]))
+        log((libs, b, libs[b]))
+        log((ghash, b, ghash[b]))
+        stones[a] |= stones[b]
+        libs[a] |= libs[b]
+        ghash[a] ^= ghash[b]
+        stones[b] = 0
+        libs[b] = 0
+        ghash[b] = 0
+        return a
+
+    def _remove_group(self, root):
+        cells, gid, libs, neighbors = self._cells, self._gid, self._libs, self._neighbors
+        stones, ghash = self._stones, self._ghash
+        log = self._trail.append
+        color = cells[root]
+        removed = list(iter_bits(stones[root]))
+        for q in removed:
+            log((cells, q, color))
+            log((gid, q, root))
+            cells[q] = EMPTY
+            gid[q] = -1
+        self.hash ^= ghash[root]
+        log((stones, root, stones[root]))
+        log((ghash, root, ghash[root]))
+        stones[root] = 0
+        ghash[root] = 0
+        lib_sums = self.liberty_sums
+        for q in removed:
+            bit = 1 << q
+            for n in neighbors[q]:
+                g = gid[n]
+                if g >= 0 and not libs[g] & bit:
+                    log((libs, g, libs[g]))
+                    libs[g] |= bit
+                    lib_sums[cells[g]] += stones[g].bit_count()
+        return removed
+
+    def rollback(self, mark):
+        """Undoes every logged array write made after the trail had length `mark`."""
+        trail = self._trail
+        while len(trail) > mark:
+            seq, i, old = trail.pop()
+            seq[i] = old
+        self._view = None
+
+    # --- Move generation ---
+
+    def classify_move(self, r, c):
+        """Returns LEGAL, OCCUPIED, SUICIDE or KO for the side to move playing (r, c)."""
+        p = r * self.size + c
+        if self._cells[p] != EMPTY:
+            return OCCUPIED
+        color = self.current_player
+        captured = self.capturing_roots(p, color)
+        if not captured and self.is_suicide(p, color):
+            return SUICIDE
+        key = self.hash ^ self._zobrist[color][p]
+        for g in captured:
+            key ^= self._ghash[g]
+        if self.repeats_position(key, p, color, captured):
+            return KO
+        return LEGAL
+
+    def iter_legal_moves(self):
+        """Yields every legal (r, c) for the side to move in raster order.
+
+        Each empty point is classified from its neighbours' group records: it is
+        suicide unless it touches an empty point, a friendly group with another
+        liberty or an opponent group it captures, and a superko repeat if the
+        resulting Zobrist key is already in the history. Nothing is copied."""
+        cells, gid, libs, ghash = self._cells, self._gid, self._libs, self._ghash
+        neighbors, history, size = self._neighbors, self.history, self.size
+        color = self.current_player
+        zkeys = self._zobrist[color]
+        h = self.hash
+        for p, v in enumerate(cells):
+            if v: continue
+            bit = 1 << p
+            key = h ^ zkeys[p]
+            breathes = False
+            captured = None
+            for q in neighbors[p]:
+                v = cells[q]
+                if v == EMPTY:
+                    breathes = True
+                    continue
+                g = gid[q]
+                if v == color:
+                    if libs[g] != bit: breathes = True
+                elif libs[g] == bit:
+                    breathes = True
+                    if captured is None:
+                        captured = [g]
+                    elif g in captured:
+                        continue
+                    else:
+                        captured.append(g)
+                    key ^= ghash[g]
+            if not breathes:
+                continue
+            if key in history and self.repeats_position(key, p, color, captured or ()):
+                continue
+            yield divmod(p, size)
+
+    def capturing_roots(self, p, color):
+        """Roots of the opponent groups that a `color` stone on p would capture."""
+        cells, gid, libs = self._cells, self._gid, self._libs
+        bit = 1 << p
+        roots = []
+        for q in self._neighbors[p]:
+            v = cells[q]
+            if v != EMPTY and v != color:
+                g = gid[q]
+                if libs[g] == bit and g not in roots: roots.append(g)
+        return roots
+
+    def is_suicide(self, p, color):
+        """True if a `color` stone on empty point p would have no liberties."""
+        cells, gid, libs = self._cells, self._gid, self._libs
+        bit = 1 << p
+        for q in self._neighbors[p]:
+            v = cells[q]
+            if v == EMPTY:
+                return False
+            g = gid[q]
+            if v == color:
+                if libs[g] & ~bit: return False
+            elif libs[g] == bit:
+                return False
+        return True
+
+    def liberty_count(self, r, c):
+        g = self._gid[r * self.size + c]
+        return self._libs[g].bit_count() if g >= 0 else 0
+
+    def group_points(self, r, c):
+        g = self._gid[r * self.size + c]
+        if g < 0: return set()
+        size = self.size
+        return {divmod(q, size) for q in iter_bits(self._stones[g])}
+
+    # --- Scoring ---
 
     def calculate_score(self, dead_stones_set=None):
         if dead_stones_set is None: dead_stones_set = set()
 
-        score_board = copy.deepcopy(self.board)
+        score_board = [list(row) for row in self.board]
 
         extra_black_captures = 0
         extra_white_captures = 0
@@ -90,6 +547,8 @@ class GoState:
                     owners.add(board[nr][nc])
         return region, owners
 
+    # --- Board helpers (work on any list-of-rows board) ---
+
     def remove_dead_stones(self, board, r, c, color_to_check):
         dead_stones = []
         neighbors = self.get_neighbors(r, c)
@@ -107,6 +566,8 @@ class GoState:
         return dead_stones
 
     def get_group(self, board, r, c):
+        if board is self._view:
+            return self.group_points(r, c)
         color = board[r][c]
         group = set()
         stack = [(r, c)]
@@ -119,6 +580,8 @@ class GoState:
         return group
 
     def count_liberties(self, board, r, c):
+        if board is self._view:
+            return self.liberty_count(r, c)
         group = self.get_group(board, r, c)
         liberties = set()
         for gr, gc in group:
@@ -0,0 +1,124 @@
+import time
+
+
+class SearchStats:
+    """
+    What one MinimaxAgent.get_best_move() call did (MinimaxAgent(stats=True)).
+
+    Per ply (0 = root): nodes visited, leaf evaluations, cutoffs (beta
+    cutoffs at MAX nodes, alpha cutoffs at MIN nodes) and how many of those
+    came from the first move tried. Totals: nodes per completed iteration,
+    transposition table probes and hits, and the time spent generating moves,
+    making/unmaking them (play/undo, the in-place form of result()) and
+    evaluating leaves. Only the serial search is instrumented; worker
+    processes of a parallel search are not counted.
+    """
+    def __init__(self):
+        self.nodes = []
+        self.leaves = []
+        self.cutoffs = []
+        self.first_cutoffs = []
+        self.iteration_nodes = []
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.time_actions = 0.0
+        self.time_play = 0.0
+        self.time_heuristic = 0.0
+        self.elapsed = 0.0
+
+    def ply(self, ply):
+        while len(self.nodes) <= ply:
+            self.nodes.append(0)
+            self.leaves.append(0)
+            self.cutoffs.append(0)
+            self.first_cutoffs.append(0)
+
+    def node(self, ply):
+        if ply >= len(self.nodes):
+            self.ply(ply)
+        self.nodes[ply] += 1
+
+    @property
+    def total_nodes(self):
+        return sum(self.nodes)
+
+    @property
+    def nodes_per_sec(self):
+        return self.total_nodes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def branching_factor(self):
+        """Effective branching factor: node growth between the last two
+        iterations, or N^(1/d) for a single iteration of depth d."""
+        its = self.iteration_nodes
+        if len(its) >= 2 and its[-2]:
+            return its[-1] / its[-2]
+        if its:
+            return its[-1] ** (1 / (len(self.nodes) - 1)) if len(self.nodes) > 1 else float(its[-1])
+        return 0.0
+
+    @property
+    def first_move_cutoff_rate(self):
+        cutoffs = sum(self.cutoffs)
+        return sum(self.first_cutoffs) / cutoffs if cutoffs else 0.0
+
+    def as_dict(self):
+        return {
+            'nodes': self.total_nodes,
+            'leaves': sum(self.leaves),
+            'cutoffs': sum(self.cutoffs),
+            'first_move_cutoff_rate': self.first_move_cutoff_rate,
+            'branching_factor': self.branching_factor,
+            'nodes_per_sec': self.nodes_per_sec,
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'time': self.elapsed,
+            'time_actions': self.time_actions,
+            'time_play': self.time_play,
+            'time_heuristic': self.time_heuristic,
+            'per_ply': [
+                {'nodes': n, 'leaves': l, 'cutoffs': c, 'first_cutoffs': f}
+                for n, l, c, f in zip(self.nodes, self.leaves, self.cutoffs, self.first_cutoffs)
+            ],
+        }
+
+    def summary(self):
+        lines = [
+            f"{self.total_nodes} nodes in {self.elapsed * 1000:.0f} ms ({self.nodes_per_sec:.0f} nodes/s), "
+            f"EBF {self.branching_factor:.2f}, first-move cutoffs {self.first_move_cutoff_rate:.0%}, "
+            f"TT hits {self.tt_hits}/{self.tt_probes}",
+            f"time: actions {self.time_actions * 1000:.0f} ms, play/undo {self.time_play * 1000:.0f} ms, "
+            f"heuristic {self.time_heuristic * 1000:.0f} ms",
+        ]
+        for ply, (n, l, c, f) in enumerate(zip(self.nodes, self.leaves, self.cutoffs, self.first_cutoffs)):
+            rate = f / c if c else 0.0
+            lines.append(f"  ply {ply}: {n} nodes, {l} leaves, {c} cutoffs ({rate:.0%} on first move)")
+        return '\n'.join(lines)
+
+
+class TimedProblem:
+    """Wraps the agent's problem for the search of an instrumented
+    get_best_move() (the agent's `problem` itself is left alone) and times
+    actions() and play()/undo(); everything else is passed through."""
+    def __init__(self, problem, stats):
+        self.problem = problem
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def actions(self, state):
+        start = time.perf_counter()
+        moves = self.problem.actions(state)
+        self.stats.time_actions += time.perf_counter() - start
+        return moves
+
+    def play(self, state, action):
+        start = time.perf_counter()
+        self.problem.play(state, action)
+        self.stats.time_play += time.perf_counter() - start
+
+    def undo(self, state):
+        start = time.perf_counter()
+        self.problem.undo(state)
+        self.stats.time_play += time.perf_counter() - start
@@ -0,0 +1,105 @@
+from .state import WHITE
+
+# Bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# XOR-ed into the position key when White is to move
+SIDE_KEY = 0x9E3779B97F4A7C15
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table for alpha-beta search.
+
+    Keys are the Zobrist position hash combined with the side to move. Each
+    bucket has two slots: a depth-preferred slot that keeps the deepest search
+    of the positions mapping to it, and an always-replace slot that takes
+    everything else. Entries are tuples (key, depth, value, flag, move,
+    generation) where flag is EXACT, LOWER or UPPER, so the table never holds
+    more than `max_entries` positions.
+
+    Each search starts a new generation (new_generation()). Entries from the
+    previous search are still used, which is how a turn reuses the subtree
+    that survived the last two moves; older entries count as empty and are
+    overwritten first. `reused` counts hits on previous-generation entries.
+
+    `hits`, `misses`, `collisions` (misses on a bucket holding other
+    positions) and `stores` are counted since construction or clear().
+    """
+    def __init__(self, max_entries=1 << 18):
+        buckets = 1
+        while buckets * 2 <= max(1, max_entries // 2):
+            buckets *= 2
+        self.mask = buckets - 1
+        self.max_entries = buckets * 2
+        self.deep = [None] * buckets
+        self.recent = [None] * buckets
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.reused = 0
+
+    @staticmethod
+    def key(state):
+        if state.current_player == WHITE:
+            return state.hash ^ SIDE_KEY
+        return state.hash
+
+    def new_generation(self):
+        self.generation += 1
+
+    def probe(self, key):
+        """Returns the entry stored for `key`, or None."""
+        i = key & self.mask
+        oldest = self.generation - 1
+        for entry in (self.deep[i], self.recent[i]):
+            if entry is not None and entry[0] == key and entry[5] >= oldest:
+                self.hits += 1
+                if entry[5] != self.generation:
+                    self.reused += 1
+                return entry
+        entry, other = self.deep[i], self.recent[i]
+        self.misses += 1
+        if entry is not None or other is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, value, flag, move):
+        i = key & self.mask
+        self.stores += 1
+        entry = (key, depth, value, flag, move, self.generation)
+        current = self.deep[i]
+        if current is None or current[0] == key or depth >= current[1] or current[5] < self.generation - 1:
+            if current is not None and current[0] != key:
+                # Keep the displaced entry in the always-replace slot
+                self.recent[i] = current
+            elif self.recent[i] is not None and self.recent[i][0] == key:
+                self.recent[i] = None
+            self.deep[i] = entry
+        else:
+            self.recent[i] = entry
+
+    def clear(self):
+        self.deep = [None] * (self.mask + 1)
+        self.recent = [None] * (self.mask + 1)
+        self.hits = self.misses = self.collisions = self.stores = self.reused = 0
+
+    def __len__(self):
+        return sum(e is not None for e in self.deep) + sum(e is not None for e in self.recent)
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'reused': self.reused,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
@@ -0,0 +1,209 @@
+"""
+Array versions of the board scans in GoState, for scoring many positions at
+once (self-play analysis, benchmarks). Requires numpy, which the rest of the
+package does not need; importing this module without it raises ImportError.
+
+Boards are stacked into an (N, size, size) int8 array with the GoState cell
+values. Everything works on the whole stack at once:
+
+- neighbours come from shifted copies of the array (shift()), so "touches
+  a black stone" is an OR of four shifted masks
+- connected regions are labelled by min-label propagation with pointer
+  jumping over the flattened stack: every point starts labelled with its own
+  flat index, takes the smallest label among itself and its same-region
+  neighbours, hooks its old label to the new one and then follows labels
+  to their labels, until nothing changes. The final label of a region is
+  its smallest flat index.
+"""
+import numpy as np
+
+from .state import EMPTY, BLACK, WHITE, KOMI
+
+
+def stack_boards(states):
+    """(N, size, size) int8 array of the states' boards."""
+    size = states[0].size
+    data = b''.join(bytes(state._cells) for state in states)
+    return np.frombuffer(data, dtype=np.int8).reshape(len(states), size, size).copy()
+
+
+def shift(a, dr, dc, fill=0):
+    """`a` moved by (dr, dc) along the last two axes; out[.., r, c] = a[.., r - dr, c - dc]."""
+    out = np.full_like(a, fill)
+    rows = a.shape[-2]
+    cols = a.shape[-1]
+    src_r = slice(max(0, -dr), rows - max(0, dr))
+    dst_r = slice(max(0, dr), rows - max(0, -dr))
+    src_c = slice(max(0, -dc), cols - max(0, dc))
+    dst_c = slice(max(0, dc), cols - max(0, -dc))
+    out[..., dst_r, dst_c] = a[..., src_r, src_c]
+    return out
+
+
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def touches(mask):
+    """True where at least one orthogonal neighbour is in `mask`."""
+    out = np.zeros_like(mask)
+    for dr, dc in DIRECTIONS:
+        out |= shift(mask, dr, dc, False)
+    return out
+
+
+def label(mask):
+    """
+    Connected components of `mask` (N, size, size), per board. Returns an
+    int array of the same shape holding, for every masked point, the smallest
+    flat index (into mask.ravel()) of its component, and -1 elsewhere.
+    """
+    n = mask.size
+    big = n
+    flat = np.arange(n, dtype=np.int64).reshape(mask.shape)
+    lab = np.where(mask, flat, big)
+    idx = np.flatnonzero(mask)
+    if not idx.size:
+        return np.full(mask.shape, -1, dtype=np.int64)
+    # Neighbour pairs inside the mask, found once
+    pairs = []
+    for dr, dc in DIRECTIONS:
+        both = mask & shift(mask, dr, dc, False)
+        dst = np.flatnonzero(both)
+        src = dst - (dr * mask.shape[-1] + dc)
+        pairs.append((dst, src))
+
+    lab = lab.ravel()
+    while True:
+        old = lab.copy()
+        new = lab.copy()
+        for dst, src in pairs:
+            np.minimum.at(new, dst, lab[src])
+        # Hook the old representative to the new label, then jump
+        np.minimum.at(lab, old[idx], new[idx])
+        np.minimum(lab, new, out=lab)
+        while True:
+            jumped = lab[lab[idx]]
+            if np.array_equal(jumped, lab[idx]):
+                break
+            lab[idx] = jumped
+        if np.array_equal(lab, old):
+            break
+    lab[lab == big] = -1
+    return lab.reshape(mask.shape)
+
+
+def territory_masks(boards, dead=None):
+    """
+    (black, white) territory masks for stacked boards, as calculate_score
+    sees them: empty regions (dead stones count as empty) bordered by stones
+    of one colour only.
+    """
+    empty = boards == EMPTY
+    if dead is not None:
+        empty = empty | dead
+    black = (boards == BLACK) & ~empty
+    white = (boards == WHITE) & ~empty
+    lab = label(empty)
+    owned_b = np.zeros(boards.size + 1, dtype=bool)
+    owned_w = np.zeros(boards.size + 1, dtype=bool)
+    owned_b[lab[empty & touches(black)]] = True
+    owned_w[lab[empty & touches(white)]] = True
+    region_b = owned_b[lab] & empty
+    region_w = owned_w[lab] & empty
+    return region_b & ~region_w, region_w & ~region_b
+
+
+def dead_masks(states, dead_sets):
+    """Boolean (N, size, size) mask of the given dead-stone sets."""
+    size = states[0].size
+    dead = np.zeros((len(states), size, size), dtype=bool)
+    for i, points in enumerate(dead_sets):
+        for r, c in points:
+            dead[i, r, c] = True
+    return dead
+
+
+def score_batch(states, dead_sets=None, boards=None):
+    """
+    calculate_score() totals for many positions: a float array of shape
+    (N, 2) with the Black and White scores (White's including komi).
+    `boards` may pass a ready stack_boards(states).
+    """
+    if boards is None:
+        boards = stack_boards(states)
+    dead = dead_masks(states, dead_sets) if dead_sets is not None else None
+    captures = [(state.captures[BLACK], state.captures[WHITE]) for state in states]
+    return score_boards(boards, captures, dead)
+
+
+def score_boards(boards, captures, dead=None):
+    """
+    score_batch() on arrays alone: `boards` (N, size, size), `captures` (N, 2)
+    Black/White captures and an optional boolean `dead` mask.
+    """
+    black_t, white_t = territory_masks(boards, dead)
+    scores = np.empty((len(boards), 2))
+    scores[:, 0] = black_t.sum(axis=(1, 2))
+    scores[:, 1] = white_t.sum(axis=(1, 2)) + KOMI
+    scores += captures
+    if dead is not None:
+        # Dead stones are captures for the other side
+        scores[:, 0] += (dead & (boards == WHITE)).sum(axis=(1, 2))
+        scores[:, 1] += (dead & (boards == BLACK)).sum(axis=(1, 2))
+    return scores
+
+
+def calculate_score(state, dead_stones_set=None):
+    """Same result as state.calculate_score(dead_stones_set), territory in raster order."""
+    boards = stack_boards([state])
+    dead = dead_masks([state], [dead_stones_set]) if dead_stones_set else None
+    black_t, white_t = territory_masks(boards, dead)
+    black_territory_pts = [(int(r), int(c)) for r, c in np.argwhere(black_t[0])]
+    white_territory_pts = [(int(r), int(c)) for r, c in np.argwhere(white_t[0])]
+
+    extra_black_captures = extra_white_captures = 0
+    if dead is not None:
+        extra_black_captures = int((dead & (boards == WHITE)).sum())
+        extra_white_captures = int((dead & (boards == BLACK)).sum())
+
+    final_black = state.captures[BLACK] + extra_black_captures + len(black_territory_pts)
+    final_white = state.captures[WHITE] + extra_white_captures + len(white_territory_pts) + KOMI
+    return {
+        BLACK: final_black,
+        WHITE: final_white,
+        'winner': BLACK if final_black > final_white else WHITE,
+        'black_territory': black_territory_pts,
+        'white_territory': white_territory_pts,
+    }
+
+
+def group_terms(boards):
+    """
+    Per-board heuristic terms of RobustMinimaxAgent: (stones_diff,
+    black_liberties, white_liberties), each an int array of length N. A
+    group adds size * liberties to its colour's liberty sum, as in
+    GoState.liberty_sums.
+    """
+    n = boards.size
+    black = boards == BLACK
+    white = boards == WHITE
+    empty = boards == EMPTY
+    groups = np.where(black, label(black), label(white)).ravel()
+    counts = np.bincount(groups[groups >= 0], minlength=n)
+
+    # Distinct (group, empty neighbour) pairs are the liberties
+    keys = []
+    cols = boards.shape[-1]
+    for dr, dc in DIRECTIONS:
+        lib = np.flatnonzero(empty & shift(~empty, dr, dc, False))
+        owner = groups[lib - (dr * cols + dc)]
+        keys.append(owner * n + lib)
+    keys = np.unique(np.concatenate(keys))
+    libs = np.bincount(keys // n, minlength=n)
+
+    weighted = (counts * libs).reshape(boards.shape)
+    roots = (np.arange(n) == groups).reshape(boards.shape)
+    black_libs = (weighted * (roots & black)).sum(axis=(1, 2))
+    white_libs = (weighted * (roots & white)).sum(axis=(1, 2))
+    stones_diff = black.sum(axis=(1, 2)) - white.sum(axis=(1, 2))
+    return stones_diff, black_libs, white_libs
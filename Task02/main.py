@@ -1,7 +1,18 @@
 # main.py
+import os
 import pygame
 import sys
-from game import GoState, BLACK, WHITE, EMPTY, BOARD_SIZE, GoProblem, RobustMinimaxAgent
+import time
+from game import (GoState, BLACK, WHITE, EMPTY, BOARD_SIZE, GoProblem, RobustMinimaxAgent, MoveOrderer,
+                  Ponderer, SearchJob, ScoreKeeper, OpeningBook, sgf)
+
+# AI search budget: iterative deepening up to AI_MAX_DEPTH within AI_TIME_LIMIT seconds
+AI_TIME_LIMIT = 0.5
+AI_MAX_DEPTH = 10
+# Print per-ply search statistics (nodes, cutoffs, branching factor, timings) after each AI move
+AI_SEARCH_STATS = False
+# Opening book built with build_book.py; used when the file exists
+AI_OPENING_BOOK = "opening.book"
 
 # UI Constants
 CELL_SIZE = 60
@@ -17,16 +28,23 @@ class GoGameUI:
         self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE + 80))
         pygame.display.set_caption("Go (9x9) - AI")
         self.clock = pygame.time.Clock()
+        self.build_sprites()
+        self.drawn = None
 
         self.state = GoState(BOARD_SIZE)
         self.problem = GoProblem(self.state)
         self.mode = "PvP"
         self.ai_agent = None
+        self.ponderer = None
+        self.ai_job = None
+        self.past_states = []
+        self.moves = []
 
         # Scoring vars
         self.scoring_mode = False
         self.dead_stones = set()
         self.score_result = None
+        self.score_keeper = ScoreKeeper()
 
         self.font = pygame.font.SysFont('Arial', 18)
         self.large_font = pygame.font.SysFont('Arial', 24, bold=True)
@@ -58,6 +76,8 @@ class GoGameUI:
             "INSTRUCTIONS:",
             " - PLAY: Click to place stone.",
             " - PASS: Press 'P' to pass.",
+            " - UNDO: Press 'U' to take back a move.",
+            " - SAVE: Press 'S' to save the game as SGF.",
             " - END: Two consecutive passes end the game.",
             " - SCORING: Click stones to mark DEAD."
         ]
@@ -72,87 +92,170 @@ class GoGameUI:
             self.in_menu = False
         elif self.btn_pvc.collidepoint(pos):
             self.mode = "PvC"
-            self.ai_agent = RobustMinimaxAgent(self.problem, depth=2, ai_color=WHITE)
+            self.ai_agent = RobustMinimaxAgent(self.problem, depth=AI_MAX_DEPTH, ai_color=WHITE,
+                                               time_limit=AI_TIME_LIMIT, ordering=MoveOrderer(),
+                                               stats=AI_SEARCH_STATS,
+                                               book=OpeningBook(AI_OPENING_BOOK) if os.path.exists(AI_OPENING_BOOK) else None)
+            # Search the expected reply's position while the human thinks
+            self.ponderer = Ponderer(self.ai_agent)
             self.in_menu = False
 
-    def draw_board(self):
-        self.screen.fill(BG_COLOR)
-
-        # Draw Grid
+    def build_sprites(self):
+        """Grid background and stone/ghost/territory sprites, rendered once."""
+        self.background = pygame.Surface(self.screen.get_size()).convert()
+        self.background.fill(BG_COLOR)
         for i in range(BOARD_SIZE):
-            pygame.draw.line(self.screen, LINE_COLOR, (MARGIN, MARGIN + i * CELL_SIZE),
+            pygame.draw.line(self.background, LINE_COLOR, (MARGIN, MARGIN + i * CELL_SIZE),
                              (WINDOW_SIZE - MARGIN, MARGIN + i * CELL_SIZE), 2)
-            pygame.draw.line(self.screen, LINE_COLOR, (MARGIN + i * CELL_SIZE, MARGIN),
+            pygame.draw.line(self.background, LINE_COLOR, (MARGIN + i * CELL_SIZE, MARGIN),
                              (MARGIN + i * CELL_SIZE, WINDOW_SIZE - MARGIN), 2)
 
-        # Draw Territory Markers (Only in Scoring Mode)
+        center = (CELL_SIZE // 2, CELL_SIZE // 2)
+        radius = CELL_SIZE // 2 - 2
+        self.stone_sprites = {}
+        self.ghost_sprites = {}
+        for cell, color in ((BLACK, (0, 0, 0)), (WHITE, (255, 255, 255))):
+            stone = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+            pygame.draw.circle(stone, color, center, radius)
+            if cell == WHITE:
+                pygame.draw.circle(stone, LINE_COLOR, center, radius, 1)
+            self.stone_sprites[cell] = stone
+
+            # Ghost stone with a red X for stones marked dead
+            ghost = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+            pygame.draw.circle(ghost, (*color, 100), center, radius)
+            x, y = center
+            pygame.draw.line(ghost, (200, 0, 0), (x - 10, y - 10), (x + 10, y + 10), 3)
+            pygame.draw.line(ghost, (200, 0, 0), (x + 10, y - 10), (x - 10, y + 10), 3)
+            self.ghost_sprites[cell] = ghost
+
+        self.territory_sprites = {}
+        for cell, color in ((BLACK, (0, 0, 0)), (WHITE, (255, 255, 255))):
+            marker = pygame.Surface((16, 16))
+            marker.fill(color)
+            if cell == WHITE:
+                pygame.draw.rect(marker, (0, 0, 0), (0, 0, 16, 16), 1)
+            self.territory_sprites[cell] = marker
+
+    def cell_rect(self, r, c):
+        return pygame.Rect(MARGIN + c * CELL_SIZE - CELL_SIZE // 2, MARGIN + r * CELL_SIZE - CELL_SIZE // 2,
+                           CELL_SIZE, CELL_SIZE)
+
+    def draw_board(self):
+        """
+        Draws what changed since the last frame and returns the dirty rects
+        for pygame.display.update(). Each point's look is summarised as
+        (stone, dead, territory owner, best-move marker) and only points whose
+        summary changed are redrawn from the cached background and sprites;
+        the two text bars are redrawn when their text changes. An unchanged
+        frame draws nothing. Set self.drawn = None to force a full redraw.
+        """
+        territory = {}
         if self.scoring_mode and self.score_result:
-            # Draw Black Territory
-            for r, c in self.score_result['black_territory']:
-                x = MARGIN + c * CELL_SIZE
-                y = MARGIN + r * CELL_SIZE
-                pygame.draw.rect(self.screen, (0, 0, 0), (x - 8, y - 8, 16, 16))
-            # Draw White Territory
-            for r, c in self.score_result['white_territory']:
-                x = MARGIN + c * CELL_SIZE
-                y = MARGIN + r * CELL_SIZE
-                pygame.draw.rect(self.screen, (255, 255, 255), (x - 8, y - 8, 16, 16))
-                pygame.draw.rect(self.screen, (0, 0, 0), (x - 8, y - 8, 16, 16), 1)
-
-        # Draw Stones
+            for point in self.score_result['black_territory']:
+                territory[point] = BLACK
+            for point in self.score_result['white_territory']:
+                territory[point] = WHITE
+
+        # Best move so far of a running AI search
+        progress = self.ai_job.progress() if self.ai_job is not None else None
+        best = progress['best_move'] if progress else None
+
+        board = self.state.board
+        looks = {}
         for r in range(BOARD_SIZE):
             for c in range(BOARD_SIZE):
-                cell = self.state.board[r][c]
-                x = MARGIN + c * CELL_SIZE
-                y = MARGIN + r * CELL_SIZE
-
-                # Check if stone is marked dead
-                is_dead = (r, c) in self.dead_stones
-
-                if cell != EMPTY:
-                    color = (0, 0, 0) if cell == BLACK else (255, 255, 255)
-                    alpha_color = (*color, 100) if is_dead else color
-
-                    if is_dead:
-                        # Ghost stone
-                        s = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-                        pygame.draw.circle(s, alpha_color, (CELL_SIZE // 2, CELL_SIZE // 2), CELL_SIZE // 2 - 2)
-                        self.screen.blit(s, (x - CELL_SIZE // 2, y - CELL_SIZE // 2))
-                        # Red X
-                        pygame.draw.line(self.screen, (200, 0, 0), (x - 10, y - 10), (x + 10, y + 10), 3)
-                        pygame.draw.line(self.screen, (200, 0, 0), (x + 10, y - 10), (x - 10, y + 10), 3)
-                    else:
-                        pygame.draw.circle(self.screen, color, (x, y), CELL_SIZE // 2 - 2)
-                        if cell == WHITE:
-                            pygame.draw.circle(self.screen, LINE_COLOR, (x, y), CELL_SIZE // 2 - 2, 1)
-
-        # Draw UI info
+                looks[r, c] = (board[r][c], (r, c) in self.dead_stones, territory.get((r, c)), (r, c) == best)
+
         if self.scoring_mode:
-            self.draw_scoring_info()
+            top = None
+            bottom = self.scoring_info()
         else:
             turn_str = f"{'Black' if self.state.current_player == BLACK else 'White'}'s Turn"
-            t_surf = self.font.render(turn_str + " (Press 'P' to Pass)", True, (0, 0, 128))
-            self.screen.blit(t_surf, (10, 5))
-
+            top = turn_str + " (Press 'P' to Pass)"
             cap_str = f"Captures -> Black: {self.state.captures[BLACK]}  White: {self.state.captures[WHITE]}"
-            c_surf = self.font.render(cap_str, True, (0, 0, 0))
-            self.screen.blit(c_surf, (10, WINDOW_SIZE + 10))
+            ai_str = None
+            if progress:
+                if 'depth' in progress:
+                    ai_str = f"AI thinking... depth {progress['depth']}, {progress['nodes']} nodes"
+                else:
+                    ai_str = f"AI thinking... {progress['playouts']} playouts"
+            bottom = (cap_str, ai_str)
+
+        rects = []
+        if self.drawn is None:
+            self.screen.blit(self.background, (0, 0))
+            rects.append(self.screen.get_rect())
+            self.drawn = {'looks': {}, 'top': None, 'bottom': None}
+        drawn = self.drawn
+
+        # The turn text overlaps the first row, so they are redrawn together
+        top_rect = pygame.Rect(0, 0, WINDOW_SIZE, MARGIN - 10)
+        top_dirty = top != drawn['top'] or any(drawn['looks'].get((0, c)) != looks[0, c]
+                                               for c in range(BOARD_SIZE))
+        if top_dirty:
+            self.screen.blit(self.background, top_rect, top_rect)
+            rects.append(top_rect)
+            for c in range(BOARD_SIZE):
+                drawn['looks'].pop((0, c), None)
 
-    def draw_scoring_info(self):
-        # Always recalculate to keep UI fresh
-        self.score_result = self.state.calculate_score(self.dead_stones)
+        for point, look in looks.items():
+            if drawn['looks'].get(point) == look:
+                continue
+            drawn['looks'][point] = look
+            rect = self.cell_rect(*point)
+            self.screen.blit(self.background, rect, rect)
+            cell, is_dead, owner, is_best = look
+            if owner is not None:
+                self.screen.blit(self.territory_sprites[owner], (rect.centerx - 8, rect.centery - 8))
+            if cell != EMPTY:
+                sprites = self.ghost_sprites if is_dead else self.stone_sprites
+                self.screen.blit(sprites[cell], rect)
+            if is_best:
+                pygame.draw.circle(self.screen, (200, 0, 0), rect.center, 6)
+            rects.append(rect)
+
+        if top_dirty:
+            if top is not None:
+                self.screen.blit(self.font.render(top, True, (0, 0, 128)), (10, 5))
+            drawn['top'] = top
+
+        if bottom != drawn['bottom']:
+            drawn['bottom'] = bottom
+            rects.append(self.draw_info_bar(bottom))
+        return rects
+
+    def draw_info_bar(self, info):
+        bar = pygame.Rect(0, WINDOW_SIZE, WINDOW_SIZE, 80)
+        if self.scoring_mode:
+            self.draw_scoring_info(info)
+            return bar
+        self.screen.blit(self.background, bar, bar)
+        cap_str, ai_str = info
+        c_surf = self.font.render(cap_str, True, (0, 0, 0))
+        self.screen.blit(c_surf, (10, WINDOW_SIZE + 10))
+        if ai_str:
+            p_surf = self.font.render(ai_str, True, (128, 0, 0))
+            self.screen.blit(p_surf, (10, WINDOW_SIZE + 40))
+        return bar
+
+    def scoring_info(self):
         res = self.score_result
+        return res[BLACK], res[WHITE], res['winner']
+
+    def draw_scoring_info(self, info):
+        black, white, winner = info
 
         pygame.draw.rect(self.screen, (50, 50, 50), (0, WINDOW_SIZE, WINDOW_SIZE, 80))
 
         txt1 = self.font.render("SCORING: Click Dead Stones. Territory is marked with squares.", True, (255, 200, 0))
         self.screen.blit(txt1, (10, WINDOW_SIZE + 5))
 
-        score_str = f"Black: {res[BLACK]}   vs   White: {res[WHITE]} (Komi {6.5})"
+        score_str = f"Black: {black}   vs   White: {white} (Komi {6.5})"
         txt2 = self.large_font.render(score_str, True, (255, 255, 255))
         self.screen.blit(txt2, (10, WINDOW_SIZE + 35))
 
-        res_str = "Winner: Black" if res['winner'] == BLACK else "Winner: White"
+        res_str = "Winner: Black" if winner == BLACK else "Winner: White"
         txt3 = self.large_font.render(res_str, True, (0, 255, 0))
         self.screen.blit(txt3, (WINDOW_SIZE - 180, WINDOW_SIZE + 35))
 
@@ -167,7 +270,7 @@ class GoGameUI:
         if not self.scoring_mode:
             # PLAY MODE
             if self.problem.is_valid_move(self.state, r, c):
-                self.state = self.problem.result(self.state, (r, c))
+                self.play((r, c))
                 return True
         else:
             # SCORING MODE
@@ -181,9 +284,52 @@ class GoGameUI:
                     # Kill
                     for s in group:
                         self.dead_stones.add(s)
+                self.update_score()
                 return True
         return False
 
+    def update_score(self):
+        # Memoized, and a toggle only re-floods the regions around the group
+        self.score_result = self.score_keeper.score(self.state, self.dead_stones)
+
+    def play(self, move):
+        self.past_states.append(self.state)
+        self.moves.append(move)
+        self.state = self.problem.result(self.state, move)
+
+    def stop_ai(self):
+        """Cancels the AI's search and its pondering."""
+        if self.ai_job is not None:
+            self.ai_job.cancel()
+            self.ai_job = None
+        if self.ponderer is not None:
+            self.ponderer.stop()
+
+    def undo(self):
+        """Takes back the last move (in PvC, back to the human's last turn)."""
+        self.stop_ai()
+        while self.past_states:
+            self.state = self.past_states.pop()
+            self.moves.pop()
+            if self.mode != "PvC" or self.state.current_player == BLACK:
+                break
+
+    def save_game(self):
+        """Writes the moves so far to a timestamped .sgf file."""
+        result = None
+        if self.score_result:
+            winner = 'B' if self.score_result['winner'] == BLACK else 'W'
+            result = f"{winner}+{abs(self.score_result[BLACK] - self.score_result[WHITE]):g}"
+        path = time.strftime("go-%Y%m%d-%H%M%S.sgf")
+        sgf.dump(path, self.moves, size=self.state.size, result=result, PB="Human",
+                 PW="AI" if self.mode == "PvC" else "Human")
+        print(f"Game saved to {path}")
+
+    def quit(self):
+        self.stop_ai()
+        pygame.quit()
+        sys.exit()
+
     def run(self):
         while True:
             if self.in_menu:
@@ -191,23 +337,23 @@ class GoGameUI:
                 pygame.display.flip()
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
-                        pygame.quit(); sys.exit()
+                        self.quit()
                     if event.type == pygame.MOUSEBUTTONDOWN:
                         self.handle_menu_click(event.pos)
+                self.clock.tick(30)
                 continue
 
             # Auto-switch to scoring
             if self.state.game_over and not self.scoring_mode:
                 self.scoring_mode = True
+                self.update_score()
                 print("Game Over. Entering Scoring Mode.")
 
-            self.draw_board()
-            pygame.display.flip()
+            pygame.display.update(self.draw_board())
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit();
-                    sys.exit()
+                    self.quit()
 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if self.scoring_mode:
@@ -215,24 +361,37 @@ class GoGameUI:
                     elif self.mode == "PvP" or (self.mode == "PvC" and self.state.current_player == BLACK):
                         self.handle_click(event.pos)
 
-                if event.type == pygame.KEYDOWN and not self.scoring_mode:
-                    if event.key == pygame.K_p:
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_s:
+                    self.save_game()
+                elif event.type == pygame.KEYDOWN and not self.scoring_mode:
+                    if event.key == pygame.K_u:
+                        self.undo()
+                    elif event.key == pygame.K_p and self.ai_job is None:
                         print(f"Player ({'Black' if self.state.current_player == BLACK else 'White'}) passed.")
-                        self.state = self.problem.result(self.state, None)
+                        self.play(None)
 
-            # AI TURN
+            # AI TURN: search in the background, play the move once it is done
             if not self.scoring_mode and self.mode == "PvC" and self.state.current_player == WHITE:
-                self.draw_board()
-                pygame.display.flip()
-                pygame.time.wait(100)
-
-                move = self.ai_agent.get_best_move(self.state)
+                if self.ai_job is None:
+                    self.ai_job = SearchJob(self.ai_agent, self.state, self.ponderer.get_best_move)
+            if self.ai_job is not None and self.ai_job.done:
+                move = self.ai_job.move
+                self.ai_job = None
+                info = self.ai_agent.last_search
+                if info:
+                    print(f"AI searched depth {info['depth']} in {info['time'] * 1000:.0f} ms "
+                          f"({info['nodes']} nodes, {info['tt_reused']} reused from last turn)")
+                if self.ai_agent.last_stats is not None:
+                    print(self.ai_agent.last_stats.summary())
+                if self.ponderer.hits + self.ponderer.misses:
+                    print(f"Ponder {'hit' if self.ponderer.last_was_hit else 'miss'} "
+                          f"(hit rate {self.ponderer.hit_rate:.0%})")
                 if move:
                     print(f"AI plays {move}")
-                    self.state = self.problem.result(self.state, move)
                 else:
                     print("AI Passes.")
-                    self.state = self.problem.result(self.state, None)
+                self.play(move)
+                self.ponderer.start(self.state)
 
             self.clock.tick(30)
 
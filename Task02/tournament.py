@@ -0,0 +1,150 @@
+# tournament.py
+"""
+Headless engine-vs-engine games, no pygame needed.
+
+Plays N games between two agents, swapping colours every game, spread over
+a process pool. Every finished game is written as one JSON line: players,
+winner, final score, the move list ([r, c] or null for a pass) and the time
+and search report of every move. Progress and a win/loss summary go to
+stderr.
+
+Agents are given as "kind:key=value,...":
+    minimax:depth=10,time=0.5           RobustMinimaxAgent with MoveOrderer
+    minimax:depth=3,incremental=0       flood-fill heuristic instead of counters
+    minimax:depth=3,ordering=0,tt=0     no move ordering / no transposition table
+    minimax:depth=3,stats=1             record SearchStats with every move
+    mcts:playouts=1000                  MCTSAgent (or time=0.5)
+    random                              uniformly random legal moves
+
+Usage:  python tournament.py minimax:depth=2 mcts:playouts=500 --games 20 --out games.jsonl
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from game import GoState, GoProblem, RobustMinimaxAgent, MCTSAgent, MoveOrderer, BLACK, WHITE, BOARD_SIZE
+
+
+class RandomAgent:
+    def __init__(self, problem, seed=None):
+        self.problem = problem
+        self.rng = random.Random(seed)
+        self.last_search = None
+
+    def get_best_move(self, state):
+        moves = self.problem.actions(state)
+        return self.rng.choice(moves) if moves else None
+
+
+def parse_spec(spec):
+    """'kind:key=value,...' -> (kind, {key: number})."""
+    kind, _, args = spec.partition(':')
+    options = {}
+    for item in filter(None, args.split(',')):
+        key, _, value = item.partition('=')
+        options[key] = float(value) if '.' in value else int(value)
+    if kind not in ('minimax', 'mcts', 'random'):
+        raise ValueError(f"unknown agent kind {kind!r} in {spec!r}")
+    return kind, options
+
+
+def make_agent(spec, color, seed):
+    kind, options = parse_spec(spec)
+    problem = GoProblem()
+    if kind == 'random':
+        return RandomAgent(problem, seed=seed)
+    if kind == 'mcts':
+        return MCTSAgent(problem, playouts=options.get('playouts', 1000), time_limit=options.get('time'),
+                         seed=seed)
+    return RobustMinimaxAgent(problem, depth=options.get('depth', 2), ai_color=color,
+                              tt_size=(1 << 18) if options.get('tt', 1) else None,
+                              time_limit=options.get('time'),
+                              ordering=MoveOrderer() if options.get('ordering', 1) else None,
+                              incremental=bool(options.get('incremental', 1)),
+                              stats=bool(options.get('stats', 0)))
+
+
+def play_game(game_id, black_spec, white_spec, size, max_moves, seed):
+    """Plays one game and returns its JSON record."""
+    problem = GoProblem()
+    agents = {BLACK: make_agent(black_spec, BLACK, seed), WHITE: make_agent(white_spec, WHITE, seed + 1)}
+    state = GoState(size)
+    moves = []
+    times = []
+    searches = []
+    start = time.perf_counter()
+    while not state.game_over and len(moves) < max_moves:
+        agent = agents[state.current_player]
+        t = time.perf_counter()
+        move = agent.get_best_move(state)
+        times.append(round(time.perf_counter() - t, 6))
+        searches.append(agent.last_search)
+        moves.append(list(move) if move else None)
+        state = problem.result(state, move)
+
+    score = state.calculate_score()
+    return {
+        'game': game_id,
+        'black': black_spec,
+        'white': white_spec,
+        'size': size,
+        'seed': seed,
+        'winner': 'black' if score['winner'] == BLACK else 'white',
+        'score': {'black': score[BLACK], 'white': score[WHITE]},
+        'finished': state.game_over,
+        'moves': moves,
+        'move_times': times,
+        'searches': searches,
+        'time': round(time.perf_counter() - start, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless engine-vs-engine games.")
+    parser.add_argument('agent_a')
+    parser.add_argument('agent_b')
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument('--size', type=int, default=BOARD_SIZE)
+    parser.add_argument('--max-moves', type=int, default=None, help="default: 3 * size^2")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='-', help="JSONL output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    for spec in (args.agent_a, args.agent_b):
+        parse_spec(spec)
+    max_moves = args.max_moves or 3 * args.size * args.size
+    out = sys.stdout if args.out == '-' else open(args.out, 'w')
+    # Counted per slot, so self-play (agent_a == agent_b) still splits the wins
+    wins = {'a': 0, 'b': 0}
+    try:
+        with ProcessPoolExecutor(args.workers) as pool:
+            futures = []
+            for i in range(args.games):
+                # Swap colours every game
+                black, white = (args.agent_a, args.agent_b) if i % 2 == 0 else (args.agent_b, args.agent_a)
+                futures.append(pool.submit(play_game, i, black, white, args.size, max_moves,
+                                           args.seed + 2 * i))
+            for future in as_completed(futures):
+                record = future.result()
+                out.write(json.dumps(record) + '\n')
+                out.flush()
+                # Agent a plays Black in even-numbered games
+                a_won = (record['winner'] == 'black') == (record['game'] % 2 == 0)
+                wins['a' if a_won else 'b'] += 1
+                print(f"game {record['game']}: {record['black']} (B) vs {record['white']} (W), "
+                      f"{record['winner']} wins {record['score']['black']}-{record['score']['white']} "
+                      f"in {len(record['moves'])} moves, {record['time']:.1f}s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    for slot, spec in (('a', args.agent_a), ('b', args.agent_b)):
+        print(f"{slot}: {spec}: {wins[slot]}/{args.games} wins", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()